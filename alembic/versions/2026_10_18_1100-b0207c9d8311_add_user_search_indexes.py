@@ -0,0 +1,32 @@
+"""add user search indexes
+
+Revision ID: b0207c9d8311
+Revises: c0e48490cebf
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0207c9d8311'
+down_revision: Union[str, None] = 'c0e48490cebf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_FIELDS = ('username', 'email', 'name', 'surname')
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in SEARCH_FIELDS:
+        op.create_index(f'ix_users_{field}_trgm', 'users', [field], unique=False, postgresql_using='gin',
+                        postgresql_ops={field: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for field in SEARCH_FIELDS:
+        op.drop_index(f'ix_users_{field}_trgm', table_name='users', postgresql_using='gin')
+    # pg_trgm is left installed, other objects in the database may depend on it
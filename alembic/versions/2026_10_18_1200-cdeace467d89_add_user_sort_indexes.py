@@ -0,0 +1,31 @@
+"""add user sort indexes
+
+Revision ID: cdeace467d89
+Revises: b0207c9d8311
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cdeace467d89'
+down_revision: Union[str, None] = 'b0207c9d8311'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_name_id', 'users', ['name', 'id'], unique=False)
+    op.create_index('ix_users_surname_id', 'users', ['surname', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_role_id', 'users', ['role_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_role_id', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_users_surname_id', table_name='users')
+    op.drop_index('ix_users_name_id', table_name='users')
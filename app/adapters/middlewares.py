@@ -0,0 +1,95 @@
+import re
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders, Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.logger import logger, current_request_id
+from app.dependencies.metrics import http_request_duration_seconds, http_requests_in_flight, http_requests_total
+from app.dependencies.query_recorder import record_queries
+
+
+class RequestIdMiddleware:
+    # Accepts the caller's X-Request-ID when it is a sane token, so a request can be followed across services
+    header_pattern = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id")
+        if request_id is None or not self.header_pattern.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        token = current_request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            current_request_id.reset(token)
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: BaseHTTPMiddleware would add a task and a memory stream per request
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the scope, its path template keeps label cardinality bounded
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            http_request_duration_seconds.observe(time.perf_counter() - start, scope["method"], route_path)
+            http_requests_total.inc(scope["method"], route_path, status_code)
+
+
+class QueryRecorderMiddleware:
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 3):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with record_queries() as recorder:
+            async def send_with_query_count(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("X-Query-Count", str(recorder.count))
+                await send(message)
+
+            await self.app(scope, receive, send_with_query_count)
+
+        repeated = recorder.repeated(threshold=self.repeat_threshold)
+        if repeated:
+            logger.warning("%s %s ran %d statements, repeated shapes: %s",
+                           scope["method"], scope["path"], recorder.count, repeated)
+        else:
+            logger.debug("%s %s ran %d statements", scope["method"], scope["path"], recorder.count)
@@ -1,11 +1,13 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies.auth import validate_auth_user, get_current_auth_user, get_current_token_payload, \
     get_current_auth_user_for_refresh, http_bearer
 from app.dependencies.db import db_session
+from app.dependencies.http_cache import user_cache_headers, is_not_modified, not_modified
+from app.dependencies.rate_limit import register_admission
 from app.domain.schemas.user import User, UserCreate, UserUpdatePartial, CurrentUser, Token, CurrentUserUpdate
 from app.repositories.auth_repo import AuthRepo
 from app.repositories.user_crud_repo import UserRepo
@@ -21,7 +23,7 @@ async def login(
     return await auth_repo.login_user(user=user)
 
 
-@router.post("/register/", status_code=status.HTTP_201_CREATED)
+@router.post("/register/", status_code=status.HTTP_201_CREATED, dependencies=[Depends(register_admission)])
 async def register(
         user_in: UserCreate,
         session: Annotated[AsyncSession, db_session],
@@ -33,26 +35,36 @@ async def register(
 
 @router.post("/refresh-token/")
 async def refresh(
+        payload: Annotated[dict, Depends(get_current_token_payload)],
         user: Annotated[User, Depends(get_current_auth_user_for_refresh)],
         auth_repo: Annotated[AuthRepo, Depends()],
 ) -> Token:
-    return await auth_repo.refresh_jwt(user=user)
+    return await auth_repo.refresh_jwt(payload=payload, user=user)
 
 
 @router.get("/logout/")
 async def logout(
+        payload: Annotated[dict, Depends(get_current_token_payload)],
         response: Response,
+        session: Annotated[AsyncSession, db_session],
         auth_repo: Annotated[AuthRepo, Depends()],
 ) -> None:
-    return await auth_repo.logout_user(response=response)
+    return await auth_repo.logout_user(payload=payload, response=response, session=session)
 
 
 @router.get("/me/")
 async def current_user(
+        request: Request,
+        response: Response,
         payload: Annotated[dict, Depends(get_current_token_payload)],
         user: Annotated[User, Depends(get_current_auth_user)],
         auth_repo: Annotated[AuthRepo, Depends()],
 ) -> CurrentUser:
+    # iat is part of the body, so a new token means a new representation
+    headers = user_cache_headers(user, payload.get("iat"))
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    response.headers.update(headers)
     return await auth_repo.get_current_user(payload=payload, user=user)
 
 
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Response
+
+from app.config.logger import log_pipeline
+from app.dependencies.counts import count_cache
+from app.dependencies.db import db
+from app.dependencies.metrics import registry, CONTENT_TYPE
+from app.dependencies.password_hasher import password_hasher
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.rate_limit import auth_admission
+from app.dependencies.revocation import revocation_list
+from app.dependencies.token_cache import token_cache
+
+router = APIRouter(tags=["metrics"])
+
+registry.register_collector("password_hasher", password_hasher.snapshot)
+registry.register_collector("jwt_cache", token_cache.snapshot)
+registry.register_collector("principal_cache", principal_cache.snapshot)
+registry.register_collector("auth_admission", auth_admission.snapshot)
+registry.register_collector("count_cache", count_cache.snapshot)
+registry.register_collector("db_pool", db.pool_snapshot)
+registry.register_collector("logging", log_pipeline.snapshot)
+registry.register_collector("revoked_tokens", lambda: {"size": len(revocation_list)})
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
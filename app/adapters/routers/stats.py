@@ -0,0 +1,46 @@
+from fastapi import APIRouter
+
+from app.config.logger import log_pipeline
+from app.dependencies.counts import count_cache
+from app.dependencies.db import db
+from app.dependencies.password_hasher import password_hasher
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.rate_limit import auth_admission
+from app.dependencies.token_cache import token_cache
+
+router = APIRouter(tags=["internal-stats"], prefix="/internal-stats")
+
+
+@router.get("/password-hasher/")
+async def get_password_hasher_stats() -> dict:
+    return password_hasher.snapshot()
+
+
+@router.get("/token-cache/")
+async def get_token_cache_stats() -> dict:
+    return token_cache.snapshot()
+
+
+@router.get("/principal-cache/")
+async def get_principal_cache_stats() -> dict:
+    return principal_cache.snapshot()
+
+
+@router.get("/auth-admission/")
+async def get_auth_admission_stats() -> dict:
+    return auth_admission.snapshot()
+
+
+@router.get("/count-cache/")
+async def get_count_cache_stats() -> dict:
+    return count_cache.snapshot()
+
+
+@router.get("/db-pool/")
+async def get_db_pool_stats() -> dict:
+    return db.pool_snapshot()
+
+
+@router.get("/logging/")
+async def get_logging_stats() -> dict:
+    return log_pipeline.snapshot()
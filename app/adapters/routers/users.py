@@ -1,36 +1,57 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies.auth import get_current_token_payload
-from app.dependencies.db import db_session
+from app.dependencies.db import db_session, db_read_session
+from app.dependencies.http_cache import user_cache_headers, users_cache_headers, is_not_modified, not_modified
+from app.dependencies.serialization import user_page_response
 from app.domain.schemas.pagination_info import PaginationInfo
-from app.domain.schemas.user import User, UserUpdatePartialAdmin
+from app.domain.schemas.user import (User, UserUpdatePartialAdmin, UserPage, UserSelection, BulkBlockUsers,
+                                     BulkChangeRole, BulkResult)
 from app.repositories.user_repo import UserRepo
 
 router = APIRouter(tags=["users"], prefix="/users")
 
 
-@router.get("/all/")
+@router.get("/all/", response_model=UserPage)
 async def get_users(
+        request: Request,
         payload: Annotated[dict, Depends(get_current_token_payload)],
         pagination: Annotated[PaginationInfo, Depends()],
         session: Annotated[AsyncSession, db_session],
+        read_session: Annotated[AsyncSession, db_read_session],
         user_repo: Annotated[UserRepo, Depends()],
-) -> list[User]:
-    return await user_repo.get_all_users(payload=payload, pagination=pagination, session=session)
+) -> Response:
+    page = await user_repo.get_all_users(payload=payload, pagination=pagination, session=session,
+                                         read_session=read_session)
+    # The total is part of the body too, rows added or removed on other pages change it
+    headers = users_cache_headers(page.items, page.total)
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return user_page_response(page, headers=headers)
 
 
 @router.get("/user/")
 async def get_user(
+        request: Request,
+        response: Response,
         payload: Annotated[dict, Depends(get_current_token_payload)],
         user_id: UUID,
         session: Annotated[AsyncSession, db_session],
+        read_session: Annotated[AsyncSession, db_read_session],
         user_repo: Annotated[UserRepo, Depends()],
 ) -> User:
-    return await user_repo.get_user(payload=payload, user_id=user_id, session=session)
+    user = await user_repo.get_user(payload=payload, user_id=user_id, session=session, read_session=read_session)
+    headers = user_cache_headers(user)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return user
 
 
 @router.patch("/user-update/")
@@ -53,3 +74,33 @@ async def delete_user(
         user_repo: Annotated[UserRepo, Depends()],
 ) -> dict:
     return await user_repo.delete_user(payload=payload, user_id=user_id, session=session)
+
+
+@router.post("/bulk-block/")
+async def bulk_block_users(
+        payload: Annotated[dict, Depends(get_current_token_payload)],
+        bulk_block: BulkBlockUsers,
+        session: Annotated[AsyncSession, db_session],
+        user_repo: Annotated[UserRepo, Depends()],
+) -> BulkResult:
+    return await user_repo.bulk_block_users(payload=payload, bulk_block=bulk_block, session=session)
+
+
+@router.post("/bulk-role/")
+async def bulk_change_role(
+        payload: Annotated[dict, Depends(get_current_token_payload)],
+        bulk_role: BulkChangeRole,
+        session: Annotated[AsyncSession, db_session],
+        user_repo: Annotated[UserRepo, Depends()],
+) -> BulkResult:
+    return await user_repo.bulk_change_role(payload=payload, bulk_role=bulk_role, session=session)
+
+
+@router.post("/bulk-delete/")
+async def bulk_delete_users(
+        payload: Annotated[dict, Depends(get_current_token_payload)],
+        selection: UserSelection,
+        session: Annotated[AsyncSession, db_session],
+        user_repo: Annotated[UserRepo, Depends()],
+) -> BulkResult:
+    return await user_repo.bulk_delete_users(payload=payload, selection=selection, session=session)
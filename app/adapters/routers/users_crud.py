@@ -1,31 +1,61 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies.db import db_session
-from app.domain.schemas.user import User, UserCreate, UserUpdatePartial
+from app.config.config import settings
+from app.dependencies.db import db_session, db_read_session
+from app.dependencies.http_cache import user_cache_headers, users_cache_headers, is_not_modified, not_modified
+from app.dependencies.serialization import users_response
+from app.domain.schemas.export import ExportFormat
+from app.domain.schemas.user import User, UserCreate, UserUpdatePartial, BulkCreateResult
 from app.repositories.user_crud_repo import UserRepo
 
 router = APIRouter(tags=["internal-users"], prefix="/internal-users")
 
 
-@router.get("/all/")
+@router.get("/all/", response_model=list[User])
 async def get_users(
-        session: Annotated[AsyncSession, db_session],
+        request: Request,
+        session: Annotated[AsyncSession, db_read_session],
         user_repo: Annotated[UserRepo, Depends()],
-) -> list[User]:
-    return await user_repo.get_all_users(session=session)
+) -> Response:
+    users = await user_repo.get_all_users(session=session)
+    headers = users_cache_headers(users)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    return users_response(users, headers=headers)
+
+
+@router.get("/export/")
+async def export_users(
+        user_repo: Annotated[UserRepo, Depends()],
+        export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    media_type = "text/csv" if export_format is ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        user_repo.export_users(export_format=export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=users.{export_format.value}"},
+    )
 
 
 @router.get("/user/")
 async def get_user(
+        request: Request,
+        response: Response,
         user_id: UUID,
-        session: Annotated[AsyncSession, db_session],
+        session: Annotated[AsyncSession, db_read_session],
         user_repo: Annotated[UserRepo, Depends()],
 ) -> User:
-    return await user_repo.get_user(user_id=user_id, session=session)
+    user = await user_repo.get_user(user_id=user_id, session=session)
+    headers = user_cache_headers(user)
+    if is_not_modified(request, headers):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return user
 
 
 @router.post("/user-create/", status_code=status.HTTP_201_CREATED)
@@ -37,6 +67,15 @@ async def create_user(
     return await user_repo.create_user(user_in=user_in, session=session)
 
 
+@router.post("/bulk-create/")
+async def bulk_create_users(
+        users_in: Annotated[list[UserCreate], Body(min_length=1, max_length=settings.BULK_CREATE_MAX_USERS)],
+        session: Annotated[AsyncSession, db_session],
+        user_repo: Annotated[UserRepo, Depends()],
+) -> BulkCreateResult:
+    return await user_repo.bulk_create_users(users_in=users_in, session=session)
+
+
 @router.patch("/user-update/")
 async def update_user(
         user_id: UUID,
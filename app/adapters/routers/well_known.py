@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from app.config.config import settings
+from app.dependencies.keys import key_manager
+
+router = APIRouter(tags=["well-known"], prefix="/.well-known")
+
+
+@router.get("/jwks.json")
+async def get_jwks() -> Response:
+    return Response(
+        content=key_manager.jwks(),
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"},
+    )
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -7,22 +8,100 @@ BASE_DIR = Path(__file__).parent.parent.parent
 load_dotenv()
 
 
+class MissingSettingsError(RuntimeError):
+    pass
+
+
 class Settings(BaseSettings):
     DB_ECHO: bool = False
-    POSTGRES_HOST: str
-    POSTGRES_PORT: int
-    POSTGRES_DB: str
-    POSTGRES_USER: str
-    POSTGRES_PASSWORD: str
+    # Only needed once the database is first used, so the app can be imported without them
+    POSTGRES_HOST: str | None = None
+    POSTGRES_PORT: int | None = None
+    POSTGRES_DB: str | None = None
+    POSTGRES_USER: str | None = None
+    POSTGRES_PASSWORD: str | None = None
+    POSTGRES_REPLICA_HOSTS: list[str] = []
+    DB_REPLICA_RETRY_SECONDS: float = 30
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_TIMEOUT: float = 30
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Connections all workers of one server may open to each database host, None keeps the pool settings as is
+    DB_CONNECTION_BUDGET: int | None = None
+
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int | None = None
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_KEEP_ALIVE_TIMEOUT: int = 5
+    SERVER_RUN_MIGRATIONS: bool = True
 
     ALGORITHM: str = "RS256"
     PUBLIC_KEY_PATH: Path = BASE_DIR / "certs" / "jwt-public.pem"
     PRIVATE_KEY_PATH: Path = BASE_DIR / "certs" / "jwt-private.pem"
+    JWT_KID: str | None = None
+    JWT_VERIFICATION_KEYS: dict[str, Path] = {}
+    JWKS_CACHE_MAX_AGE: int = 300
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 5
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    JWT_CACHE_SIZE: int = 10000
+    REVOCATION_REFRESH_SECONDS: float = 5
+    REVOCATION_PRUNE_SECONDS: float = 600
+
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PRINCIPAL_CACHE_SIZE: int = 5000
+    PRINCIPAL_CACHE_CHECK_SECONDS: float = 5
+    ROLE_RELOAD_MIN_INTERVAL_SECONDS: float = 30
+
+    PASSWORD_HASHER_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASHER_WORKERS: int | None = None
+    PASSWORD_HASHER_MAX_PENDING: int = 64
+    PASSWORD_HASHER_BULK_WORKERS: int | None = None
+
+    AUTH_RATE_LIMIT_IP_PER_SECOND: float = 5
+    AUTH_RATE_LIMIT_IP_BURST: int = 20
+    AUTH_RATE_LIMIT_USERNAME_PER_SECOND: float = 0.1
+    AUTH_RATE_LIMIT_USERNAME_BURST: int = 5
+    AUTH_RATE_LIMIT_MAX_KEYS: int = 100000
+
+    BULK_CREATE_MAX_USERS: int = 1000
+    COUNT_CACHE_TTL_SECONDS: float = 30
+    COUNT_CACHE_SIZE: int = 1000
+    TRUSTED_SERIALIZATION: bool = False
+    EXPORT_BATCH_SIZE: int = 1000
+
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: Path | None = None
+    LOG_QUEUE_SIZE: int = 10000
+    # Share of the INFO and DEBUG records kept and records per second allowed, by logger name and its children
+    LOG_SAMPLE_RATES: dict[str, float] = {"sqlalchemy.engine": 1.0, "uvicorn.access": 1.0}
+    LOG_RATE_LIMITS: dict[str, float] = {"sqlalchemy.engine": 200, "uvicorn.access": 500}
+
+    METRICS_ENABLED: bool = True
+    QUERY_RECORDER_ENABLED: bool = False
+    QUERY_RECORDER_REPEAT_THRESHOLD: int = 3
+
+    def check_db_settings(self) -> None:
+        missing = [name for name in ("POSTGRES_HOST", "POSTGRES_PORT", "POSTGRES_DB", "POSTGRES_USER",
+                                     "POSTGRES_PASSWORD") if getattr(self, name) is None]
+        if missing:
+            raise MissingSettingsError(f"Database settings are not configured: {', '.join(missing)}")
 
     def get_db_url(self):
+        self.check_db_settings()
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    def get_replica_db_urls(self) -> list[str]:
+        self.check_db_settings()
+        urls = []
+        for replica in self.POSTGRES_REPLICA_HOSTS:
+            host, _, port = replica.partition(":")
+            urls.append(
+                f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{host}:{port or self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            )
+        return urls
+
 
 settings = Settings()
@@ -4,9 +4,10 @@ from fastapi import HTTPException, status
 class BException(HTTPException):
     status_code = 500
     detail = ""
+    headers: dict[str, str] | None = None
 
     def __init__(self):
-        super().__init__(status_code=self.status_code, detail=self.detail)
+        super().__init__(status_code=self.status_code, detail=self.detail, headers=self.headers)
 
 
 class PasswordNotValidException(BException):
@@ -24,6 +25,11 @@ class UserNotFoundException(BException):
     detail = "User not found"
 
 
+class RoleNotFoundException(BException):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Role not found"
+
+
 class InvalidTokenException(BException):
     status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Invalid token"
@@ -39,6 +45,23 @@ class UserBlockedException(BException):
     detail = "User blocked"
 
 
+class InvalidPaginationException(BException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Invalid pagination parameters"
+
+
 class PermissionDeniedException(BException):
     status_code = status.HTTP_403_FORBIDDEN
     detail = "Permission denied"
+
+
+class ServerBusyException(BException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Server is busy, try again later"
+    headers = {"Retry-After": "1"}
+
+
+class TooManyRequestsException(BException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    detail = "Too many requests"
+    headers = {"Retry-After": "1"}
@@ -1,11 +1,205 @@
+import json
 import logging
-import logging.config
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.config.config import settings
+
+current_request_id: ContextVar[str | None] = ContextVar("current_request_id", default=None)
+
+# Loggers uvicorn configures with handlers of its own, they go through the queue like everything else
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestIdFilter(logging.Filter):
+    # Runs on the logging thread, the listener thread has no access to the request's context
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps a share of the records of a high volume logger and its children and at most `per_second` of them,
+    # records of other loggers and warnings always pass
+    def __init__(self, name: str, sample_rate: float = 1.0, per_second: float | None = None):
+        super().__init__(name)
+        self.sample_rate = sample_rate
+        self.per_second = per_second
+        self.sampled_out = 0
+        self.rate_limited = 0
+        self._tokens = per_second or 0.0
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not super().filter(record):
+            return True
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return False
+        if self.per_second is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.per_second, self._tokens + (now - self._updated_at) * self.per_second)
+            self._updated_at = now
+            if self._tokens < 1:
+                self.rate_limited += 1
+                return False
+            self._tokens -= 1
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, queue_: queue.Queue):
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the listener thread; only the traceback is rendered here, while it is still current
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    def __init__(self, level: str = "INFO", queue_size: int = 10000, file_path: Path | None = None,
+                 db_echo: bool = False, sample_rates: dict[str, float] | None = None,
+                 rate_limits: dict[str, float] | None = None):
+        self.level = level
+        self.queue_size = queue_size
+        self.file_path = file_path
+        self.db_echo = db_echo
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self._handler: DroppingQueueHandler | None = None
+        self._listener: logging.handlers.QueueListener | None = None
+        self._dropped = 0
+        self._sampled_out = 0
+        self._rate_limited = 0
+
+    @property
+    def is_started(self) -> bool:
+        return self._listener is not None
+
+    def _output_handlers(self) -> list[logging.Handler]:
+        handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+        if self.file_path is not None:
+            handlers.append(logging.FileHandler(self.file_path, encoding="utf-8"))
+        formatter = JsonFormatter()
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        return handlers
+
+    def start(self) -> None:
+        if self.is_started:
+            return
+        self._handler = DroppingQueueHandler(queue.Queue(maxsize=self.queue_size))
+        self._listener = logging.handlers.QueueListener(self._handler.queue, *self._output_handlers())
+        self._listener.start()
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(self._handler)
+        root.setLevel(self.level)
+        for name in UVICORN_LOGGERS:
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+        # Instead of the engine's echo, which adds a stream handler that writes on the event loop
+        if self.db_echo:
+            logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+        # On the handler rather than the loggers, logger filters do not see records propagated from children
+        for name in set(self.sample_rates) | set(self.rate_limits):
+            self._handler.addFilter(SamplingFilter(name, sample_rate=self.sample_rates.get(name, 1.0),
+                                                   per_second=self.rate_limits.get(name)))
+        # Last, so sampled out records skip the lookup
+        self._handler.addFilter(RequestIdFilter())
+
+    def stop(self) -> None:
+        if not self.is_started:
+            return
+        logging.getLogger().removeHandler(self._handler)
+        # Counters survive a restart of the pipeline
+        self._dropped += self._handler.dropped
+        self._sampled_out += sum(f.sampled_out for f in self._sampling_filters())
+        self._rate_limited += sum(f.rate_limited for f in self._sampling_filters())
+        # Flushes what is still queued
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self._handler = None
+
+    def _sampling_filters(self) -> list[SamplingFilter]:
+        if self._handler is None:
+            return []
+        return [f for f in self._handler.filters if isinstance(f, SamplingFilter)]
+
+    def snapshot(self) -> dict:
+        sampling_filters = self._sampling_filters()
+        return {
+            "queue_size": self._handler.queue.qsize() if self.is_started else 0,
+            "queue_max_size": self.queue_size,
+            "dropped": self._dropped + (self._handler.dropped if self._handler is not None else 0),
+            "sampled_out": self._sampled_out + sum(f.sampled_out for f in sampling_filters),
+            "rate_limited": self._rate_limited + sum(f.rate_limited for f in sampling_filters),
+        }
+
+
+log_pipeline = LogPipeline(
+    level=settings.LOG_LEVEL,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    file_path=settings.LOG_FILE,
+    db_echo=settings.DB_ECHO,
+    sample_rates=settings.LOG_SAMPLE_RATES,
+    rate_limits=settings.LOG_RATE_LIMITS,
+)
 
 
 def setup_logger(logger_name=''):
-    logging.config.fileConfig('app/config/logger.config', disable_existing_loggers=False)
+    # Called from the app's startup, importing modules that log must not touch handlers or files
+    log_pipeline.start()
 
     return logging.getLogger(logger_name)
 
 
-logger = setup_logger()
+def shutdown_logger() -> None:
+    log_pipeline.stop()
+
+
+logger = logging.getLogger()
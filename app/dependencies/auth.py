@@ -7,9 +7,16 @@ from sqlalchemy.sql.elements import or_
 from app.config.exceptions import InvalidTokenException, UserNotFoundException, WrongPasswordException, \
     UserBlockedException
 from app.dependencies.db import db_session
-from app.dependencies.utils import decode_jwt, TOKEN_TYPE_FIELD, ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE, \
-    validate_password
-from app.domain.models import User, Role
+from app.dependencies.password_hasher import password_hasher
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.rate_limit import login_admission
+from app.dependencies.revocation import revocation_list
+from app.dependencies.roles import role_registry
+from app.dependencies.token_cache import token_cache
+from app.dependencies.utils import decode_jwt, TOKEN_TYPE_FIELD, ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE
+from app.domain.models import User
+from app.domain.schemas.role import Role
+from app.domain.schemas.user import UserWithRole
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/auth/login/",
@@ -17,8 +24,16 @@ oauth2_scheme = OAuth2PasswordBearer(
 http_bearer = HTTPBearer(auto_error=False)
 
 
-def get_current_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
-    return decode_jwt(token=token)
+# async so it runs on the event loop: the token cache is not safe to update from threadpool workers, and a
+# signature check on a miss is cheap next to a thread hop
+async def get_current_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_jwt(token=token)
+        token_cache.put(token, payload)
+    if revocation_list.is_revoked(payload.get("jti")) or revocation_list.is_revoked(payload.get("sid")):
+        raise InvalidTokenException
+    return payload
 
 
 def validate_token_type(
@@ -49,13 +64,31 @@ async def get_current_user_from_token(
         raise InvalidTokenException
 
 
+async def get_current_principal(
+        payload: dict,
+        session: AsyncSession,
+) -> UserWithRole:
+    username = payload.get("sub")
+    if not username:
+        raise InvalidTokenException
+    principal = principal_cache.get(username)
+    if principal is None:
+        generation = principal_cache.generation
+        user = await get_current_user_from_token(payload=payload, session=session)
+        principal = UserWithRole.model_validate(user)
+        principal_cache.put(principal, generation=generation)
+    return principal
+
+
 async def get_role_from_user(
-        user: User,
+        user: User | UserWithRole,
         session: AsyncSession,
 ) -> Role:
-    statement = select(Role).where(Role.id == user.role_id)
-    result: Result = await session.execute(statement)
-    role = result.scalar_one_or_none()
+    await role_registry.ensure_loaded(session=session)
+    role = role_registry.get(user.role_id)
+    if role is None:
+        await role_registry.reload(session=session)
+        role = role_registry.get(user.role_id)
     return role
 
 
@@ -63,9 +96,9 @@ def get_auth_user_from_token_of_type(token_type: str):
     async def auth_user_from_token_of_type(
             payload: dict = Depends(get_current_token_payload),
             session: AsyncSession = db_session,
-    ) -> User:
+    ) -> UserWithRole:
         validate_token_type(payload=payload, token_type=token_type)
-        return await get_current_user_from_token(payload=payload, session=session)
+        return await get_current_principal(payload=payload, session=session)
 
     return auth_user_from_token_of_type
 
@@ -75,6 +108,7 @@ get_current_auth_user_for_refresh = get_auth_user_from_token_of_type(REFRESH_TOK
 
 
 async def validate_auth_user(
+        _: None = Depends(login_admission),
         username: str = Form(),
         password: str = Form(),
         session: AsyncSession = db_session,
@@ -86,8 +120,8 @@ async def validate_auth_user(
     if not user:
         raise UserNotFoundException
 
-    if not validate_password(
-            password_to_validate=password,
+    if not await password_hasher.verify(
+            password=password,
             hashed_password=user.password,
     ):
         raise WrongPasswordException
@@ -0,0 +1,102 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from sqlalchemy import Select, select, func, text, ClauseElement, Executable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+
+from app.config.config import settings
+from app.domain.schemas.pagination_info import CountStrategy
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    # Binds stay parameters, the planner estimates with the real values
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class CountCache:
+    def __init__(self, ttl_seconds: float = 30, max_size: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[int, float]] = OrderedDict()
+
+    def get(self, key: Hashable) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, total: int) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (total, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+count_cache = CountCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS, max_size=settings.COUNT_CACHE_SIZE)
+
+
+async def count_exact(statement: Select, session: AsyncSession) -> int:
+    count_statement = select(func.count()).select_from(statement.order_by(None).subquery())
+    return (await session.execute(count_statement)).scalar_one()
+
+
+async def count_estimated(statement: Select, session: AsyncSession) -> int:
+    if statement.whereclause is None:
+        # The whole table: the row count kept by VACUUM and ANALYZE, -1 until the table was analyzed once
+        table = statement.get_final_froms()[0]
+        reltuples = (await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": table.name},
+        )).scalar_one()
+        if reltuples >= 0:
+            return reltuples
+    connection = await session.connection()
+    plan = (await connection.execute(Explain(statement.order_by(None)))).scalar_one()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(statement: Select, strategy: CountStrategy, cache_key: Hashable,
+                     session: AsyncSession) -> int:
+    if strategy is CountStrategy.EXACT:
+        return await count_exact(statement=statement, session=session)
+    if strategy is CountStrategy.ESTIMATED:
+        return await count_estimated(statement=statement, session=session)
+    total = count_cache.get(cache_key)
+    if total is None:
+        total = await count_exact(statement=statement, session=session)
+        count_cache.put(cache_key, total)
+    return total
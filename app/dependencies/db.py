@@ -1,19 +1,260 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import exc, make_url, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
 from app.config.config import settings
+from app.config.logger import logger
+from app.dependencies.metrics import db_pool_checkout_wait_seconds, db_query_duration_seconds
+from app.dependencies.query_recorder import record_statement
+
+
+class PoolTelemetry:
+    def __init__(self, host: str = ""):
+        self.host = host
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, wait_seconds: float) -> None:
+        self.acquisitions += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        db_pool_checkout_wait_seconds.observe(wait_seconds, self.host)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.telemetry.timeouts += 1
+            raise
+        self.telemetry.observe(time.perf_counter() - start)
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+    def snapshot(self) -> dict:
+        telemetry = self.telemetry
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            # overflow() counts down from -pool_size until the base pool is in use
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "acquisitions": telemetry.acquisitions,
+            "timeouts": telemetry.timeouts,
+            "wait_seconds_total": telemetry.wait_seconds_total,
+            "wait_seconds_avg": telemetry.wait_seconds_total / telemetry.acquisitions if telemetry.acquisitions else 0.0,
+            "wait_seconds_max": telemetry.wait_seconds_max,
+        }
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine, session_factory: async_sessionmaker):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.unhealthy_until = 0.0
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.unhealthy_until <= time.monotonic()
+
+    def mark_unhealthy(self, retry_seconds: float) -> None:
+        self.unhealthy_until = time.monotonic() + retry_seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "host": self.engine.url.host,
+            "healthy": self.is_healthy,
+            **self.engine.pool.snapshot(),
+        }
 
 
 class Database:
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(url=url, echo=echo)
-        self.session_factory = async_sessionmaker(
-            bind=self.engine, autocommit=False, autoflush=False, expire_on_commit=False
+    def __init__(
+            self,
+            url: str | Callable[[], str],
+            replica_urls: list[str] | Callable[[], list[str]] | None = None,
+            replica_retry_seconds: float = 30,
+            echo: bool = False,
+            pool_size: int = 5,
+            max_overflow: int = 10,
+            pool_recycle: int = -1,
+            pool_pre_ping: bool = False,
+            pool_timeout: float = 30,
+            statement_cache_size: int = 100,
+    ):
+        self.replica_retry_seconds = replica_retry_seconds
+        self.statement_cache_size = statement_cache_size
+        self.engine_options = dict(
+            echo=echo,
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            pool_timeout=pool_timeout,
+            connect_args={"statement_cache_size": statement_cache_size},
         )
+        # URLs may be given as callables, engines are only created by start() or on first use
+        self._url = url
+        self._replica_urls = replica_urls
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker | None = None
+        self._replicas: list[Replica] = []
+        self._next_replica = 0
+
+    def start(self) -> None:
+        if self._engine is not None:
+            return
+        url = self._url() if callable(self._url) else self._url
+        replica_urls = self._replica_urls() if callable(self._replica_urls) else self._replica_urls
+        replicas = []
+        for replica_url in replica_urls or []:
+            engine = self._create_engine(url=replica_url)
+            replicas.append(Replica(engine=engine, session_factory=self._create_session_factory(engine=engine)))
+        engine = self._create_engine(url=url)
+        self._session_factory = self._create_session_factory(engine=engine)
+        self._replicas = replicas
+        self._engine = engine
+
+    async def dispose(self) -> None:
+        for engine in self.engines if self.is_started else []:
+            await engine.dispose()
+        self._engine, self._session_factory, self._replicas = None, None, []
+
+    @property
+    def is_started(self) -> bool:
+        return self._engine is not None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self.start()
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        self.start()
+        return self._session_factory
+
+    @property
+    def replicas(self) -> list[Replica]:
+        self.start()
+        return self._replicas
+
+    def _create_engine(self, url: str) -> AsyncEngine:
+        # asyncpg caches statements it prepares itself, SQLAlchemy's dialect keeps its own cache on top
+        url = make_url(url).update_query_dict({"prepared_statement_cache_size": str(self.statement_cache_size)})
+        engine = create_async_engine(url=url, **self.engine_options)
+        engine.pool.telemetry.host = url.host
+        self._instrument_engine(engine=engine)
+        return engine
+
+    @staticmethod
+    def _instrument_engine(engine: AsyncEngine) -> None:
+        host = engine.url.host
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            record_statement(statement)
+            conn.info["query_start"] = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = conn.info.pop("query_start", None)
+            if start is not None:
+                db_query_duration_seconds.observe(time.perf_counter() - start, host)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    @staticmethod
+    def _create_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+        return async_sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [self.engine, *(replica.engine for replica in self.replicas)]
+
+    def pool_snapshot(self) -> dict:
+        if not self.is_started:
+            return {}
+        return {
+            **self.engine.pool.snapshot(),
+            "replicas": [replica.snapshot() for replica in self.replicas],
+        }
+
+    def _healthy_replicas(self) -> list[Replica]:
+        if not self.replicas:
+            return []
+        start = self._next_replica
+        self._next_replica = (start + 1) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.is_healthy]
+
+    @asynccontextmanager
+    async def read_session(self, fallback: AsyncSession | None = None) -> AsyncIterator[AsyncSession]:
+        for replica in self._healthy_replicas():
+            session = replica.session_factory()
+            try:
+                # Checking out a connection up front (with pre-ping) is what detects a dead replica
+                await session.connection()
+            except (exc.DBAPIError, OSError, asyncio.TimeoutError):
+                await session.close()
+                replica.mark_unhealthy(retry_seconds=self.replica_retry_seconds)
+                logger.warning("Read replica %s is unavailable, retrying in %ss",
+                               replica.engine.url.host, self.replica_retry_seconds)
+                continue
+            async with session:
+                yield session
+            return
+
+        if fallback is not None:
+            # The caller's primary session, a second one would hold a second connection from the same pool
+            yield fallback
+            return
+        async with self.session_factory() as session:
+            yield session
 
     async def session_dependency(self) -> AsyncSession:
         async with self.session_factory() as session:
             yield session
 
 
-db = Database(url=settings.get_db_url(), echo=True)
+db = Database(
+    url=settings.get_db_url,
+    replica_urls=settings.get_replica_db_urls,
+    replica_retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+    # DB_ECHO is applied by the logging pipeline, the engine's echo would write on the event loop
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+)
 db_session: AsyncSession = Depends(db.session_dependency)
+
+
+async def read_session_dependency(session: AsyncSession = db_session) -> AsyncSession:
+    # Depends on the request's primary session (FastAPI caches it per request), the fallback when no replica is up
+    async with db.read_session(fallback=session) as read_session:
+        yield read_session
+
+
+db_read_session: AsyncSession = Depends(read_session_dependency)
@@ -0,0 +1,55 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable
+
+from fastapi import Request, Response, status
+
+
+def _as_utc(value: datetime) -> datetime:
+    # modified_at is stored without a time zone and written by the database clock, which runs in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _cache_headers(etag_source: str, modified_at: datetime | None) -> dict[str, str]:
+    headers = {
+        "ETag": f'"{hashlib.sha1(etag_source.encode()).hexdigest()}"',
+        # Clients may keep the body but have to revalidate before using it
+        "Cache-Control": "private, no-cache",
+    }
+    if modified_at is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(modified_at), usegmt=True)
+    return headers
+
+
+def user_cache_headers(user, *extra) -> dict[str, str]:
+    return _cache_headers(":".join(str(part) for part in (user.id, user.modified_at.isoformat(), *extra)),
+                          user.modified_at)
+
+
+def users_cache_headers(users: Iterable, *extra) -> dict[str, str]:
+    # Covers the row set and every row version, so removals and reorderings change the tag too. No Last-Modified:
+    # the page's newest modified_at stays the same when a row drops out of it
+    etag_source = ",".join([*(f"{user.id}:{user.modified_at.isoformat()}" for user in users), *map(str, extra)])
+    return _cache_headers(etag_source, None)
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def is_not_modified(request: Request, headers: dict[str, str]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since, and GET uses the weak comparison
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or headers["ETag"] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or "Last-Modified" not in headers:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return parsedate_to_datetime(headers["Last-Modified"]) <= _as_utc(since)
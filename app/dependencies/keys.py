@@ -0,0 +1,115 @@
+import base64
+import hashlib
+import json
+from pathlib import Path
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding, PublicFormat, load_pem_private_key, load_pem_public_key
+)
+from jwt.algorithms import get_default_algorithms
+
+from app.config.config import settings
+from app.dependencies.token_cache import token_cache
+
+EC_CURVE_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+}
+
+
+def key_algorithm(public_key, rsa_algorithm: str = "RS256") -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return rsa_algorithm if rsa_algorithm.startswith(("RS", "PS")) else "RS256"
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return EC_CURVE_ALGORITHMS[public_key.curve.name]
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    raise ValueError(f"Unsupported JWT key type: {type(public_key).__name__}")
+
+
+def key_thumbprint(public_key) -> str:
+    der = public_key.public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+    return base64.urlsafe_b64encode(hashlib.sha256(der).digest()[:12]).decode().rstrip("=")
+
+
+class JwtKey:
+    def __init__(self, public_key, private_key=None, kid: str | None = None, rsa_algorithm: str = "RS256"):
+        self.public_key = public_key
+        self.private_key = private_key
+        self.algorithm = key_algorithm(public_key, rsa_algorithm=rsa_algorithm)
+        self.kid = kid or key_thumbprint(public_key)
+
+    def to_jwk(self) -> dict:
+        jwk = get_default_algorithms()[self.algorithm].to_jwk(self.public_key, as_dict=True)
+        jwk.update(kid=self.kid, alg=self.algorithm, use="sig")
+        return jwk
+
+
+class KeyManager:
+    def __init__(
+            self,
+            private_key_path: Path,
+            public_key_path: Path,
+            kid: str | None = None,
+            verification_key_paths: dict[str, Path] | None = None,
+            rsa_algorithm: str = "RS256",
+    ):
+        self.private_key_path = private_key_path
+        self.public_key_path = public_key_path
+        self.kid = kid
+        self.verification_key_paths = verification_key_paths or {}
+        self.rsa_algorithm = rsa_algorithm
+        self._signing_key: JwtKey | None = None
+        self._keys: dict[str, JwtKey] = {}
+        self._jwks: bytes | None = None
+
+    def load(self) -> None:
+        signing_key = JwtKey(
+            public_key=load_pem_public_key(self.public_key_path.read_bytes()),
+            private_key=load_pem_private_key(self.private_key_path.read_bytes(), password=None),
+            kid=self.kid,
+            rsa_algorithm=self.rsa_algorithm,
+        )
+        keys = {
+            kid: JwtKey(public_key=load_pem_public_key(path.read_bytes()), kid=kid, rsa_algorithm=self.rsa_algorithm)
+            for kid, path in self.verification_key_paths.items()
+        }
+        keys[signing_key.kid] = signing_key
+        self._signing_key, self._keys, self._jwks = signing_key, keys, None
+
+    def reload(self) -> None:
+        self.load()
+        # Tokens signed by a key that was just retired must be verified again
+        token_cache.clear()
+
+    @property
+    def signing_key(self) -> JwtKey:
+        if self._signing_key is None:
+            self.load()
+        return self._signing_key
+
+    def get_verification_key(self, kid: str | None) -> JwtKey | None:
+        if kid is None:
+            # Tokens issued before kid headers were introduced
+            return self.signing_key
+        if self._signing_key is None:
+            self.load()
+        return self._keys.get(kid)
+
+    def jwks(self) -> bytes:
+        if self._jwks is None:
+            if self._signing_key is None:
+                self.load()
+            self._jwks = json.dumps({"keys": [key.to_jwk() for key in self._keys.values()]}).encode()
+        return self._jwks
+
+
+key_manager = KeyManager(
+    private_key_path=settings.PRIVATE_KEY_PATH,
+    public_key_path=settings.PUBLIC_KEY_PATH,
+    kid=settings.JWT_KID,
+    verification_key_paths=settings.JWT_VERIFICATION_KEYS,
+    rsa_algorithm=settings.ALGORITHM,
+)
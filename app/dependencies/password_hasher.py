@@ -0,0 +1,142 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from app.config.config import settings
+from app.config.exceptions import ServerBusyException
+from app.dependencies.metrics import password_hash_duration_seconds
+from app.dependencies.utils import hash_password, validate_password
+
+
+def _timed_call(func: Callable, *args) -> tuple:
+    # Runs inside the worker, so the measured time excludes waiting in the executor queue
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _hash_passwords(passwords: list[str]) -> list[bytes]:
+    return [hash_password(password) for password in passwords]
+
+
+class PasswordHasherStats:
+    def __init__(self):
+        self.calls = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+        self.run_seconds_max = 0.0
+
+    def observe(self, wait_seconds: float, run_seconds: float) -> None:
+        self.calls += 1
+        self.wait_seconds_total += wait_seconds
+        self.run_seconds_total += run_seconds
+        self.run_seconds_max = max(self.run_seconds_max, run_seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "run_seconds_total": self.run_seconds_total,
+            "run_seconds_avg": self.run_seconds_total / self.calls if self.calls else 0.0,
+            "run_seconds_max": self.run_seconds_max,
+        }
+
+
+class PasswordHasher:
+    def __init__(self, executor_type: str = "thread", max_workers: int | None = None, max_pending: int = 64,
+                 bulk_workers: int | None = None):
+        self.executor_type = executor_type
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        # Bulk hashing gets a pool of its own, smaller than the CPU count, so logins never queue behind a batch
+        self.bulk_workers = bulk_workers or max(1, self.max_workers // 2)
+        self.pending = 0
+        self.bulk_pending = 0
+        self.stats = PasswordHasherStats()
+        self._executor: Executor | None = None
+        self._bulk_executor: Executor | None = None
+
+    def _create_executor(self, max_workers: int) -> Executor:
+        executor_class = ProcessPoolExecutor if self.executor_type == "process" else ThreadPoolExecutor
+        return executor_class(max_workers=max_workers)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create_executor(max_workers=self.max_workers)
+        return self._executor
+
+    @property
+    def bulk_executor(self) -> Executor:
+        if self._bulk_executor is None:
+            self._bulk_executor = self._create_executor(max_workers=self.bulk_workers)
+        return self._bulk_executor
+
+    @property
+    def is_saturated(self) -> bool:
+        return self.pending >= self.max_pending
+
+    async def _run(self, operation: str, func: Callable, *args):
+        if self.is_saturated:
+            self.stats.rejected += 1
+            raise ServerBusyException
+        self.pending += 1
+        try:
+            return await self._execute(self.executor, operation, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def _execute(self, executor: Executor, operation: str, func: Callable, *args):
+        start = time.perf_counter()
+        result, run_seconds = await asyncio.get_running_loop().run_in_executor(executor, _timed_call, func, *args)
+        self.stats.observe(wait_seconds=time.perf_counter() - start - run_seconds, run_seconds=run_seconds)
+        password_hash_duration_seconds.observe(run_seconds, operation)
+        return result
+
+    async def hash(self, password: str) -> bytes:
+        return await self._run("hash", hash_password, password)
+
+    async def hash_many(self, passwords: list[str]) -> list[bytes]:
+        # One chunk per bulk worker, on the bulk pool: the login pool and its pending budget are left alone
+        chunk_size = -(-len(passwords) // self.bulk_workers) or 1
+        chunks = [passwords[start:start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+        self.bulk_pending += len(passwords)
+        try:
+            results = await asyncio.gather(*(
+                self._execute(self.bulk_executor, "hash_many", _hash_passwords, chunk) for chunk in chunks
+            ))
+        finally:
+            self.bulk_pending -= len(passwords)
+        return [hashed for chunk in results for hashed in chunk]
+
+    async def verify(self, password: str, hashed_password: bytes) -> bool:
+        return await self._run("verify", validate_password, password, hashed_password)
+
+    def snapshot(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "workers": self.max_workers,
+            "bulk_workers": self.bulk_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "bulk_pending": self.bulk_pending,
+            **self.stats.as_dict(),
+        }
+
+    def shutdown(self) -> None:
+        for executor in (self._executor, self._bulk_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._bulk_executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASHER_EXECUTOR,
+    max_workers=settings.PASSWORD_HASHER_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+    bulk_workers=settings.PASSWORD_HASHER_BULK_WORKERS,
+)
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+import asyncpg
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.config import settings
+from app.config.logger import logger
+from app.domain.schemas.user import UserWithRole
+
+INVALIDATION_CHANNEL = "principal_cache_invalidation"
+CLEAR_ALL = "*"
+# NOTIFY payloads must stay below 8000 bytes, larger invalidations clear every cache instead
+MAX_PAYLOAD_LENGTH = 7900
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float = 30, max_size: int = 5000, check_interval: float = 5):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        # Bumped on every invalidation, so a lookup that started before a write cannot store the stale row
+        self.generation = 0
+        self._entries: OrderedDict[str, tuple[UserWithRole, float]] = OrderedDict()
+        # Other worker processes write users too, entries are only served while their invalidations are received
+        self.listening = False
+        self._connection: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    def get(self, username: str) -> UserWithRole | None:
+        if not self.listening:
+            self.misses += 1
+            return None
+        entry = self._entries.get(username)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[username]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(username)
+        self.hits += 1
+        return user
+
+    def put(self, user: UserWithRole, generation: int) -> None:
+        if self.max_size <= 0 or not self.listening or generation != self.generation:
+            return
+        self._entries[user.username] = (user, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user.username)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *usernames: str) -> None:
+        self.generation += 1
+        for username in usernames:
+            self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    async def publish(self, usernames: Iterable[str], session: AsyncSession) -> None:
+        # Part of the writer's transaction: Postgres delivers it to every listening process on commit, never on rollback
+        payload = json.dumps(sorted(set(usernames)))
+        if len(payload) > MAX_PAYLOAD_LENGTH:
+            payload = CLEAR_ALL
+        await session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                              {"channel": INVALIDATION_CHANNEL, "payload": payload})
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        if payload == CLEAR_ALL:
+            self.clear()
+        else:
+            self.invalidate(*json.loads(payload))
+
+    def _stop_listening(self, *_) -> None:
+        # Invalidations may be missed from here on, so nothing cached before can be trusted either
+        self.listening = False
+        self.clear()
+
+    async def _connect(self, url: str) -> None:
+        self._connection = await asyncpg.connect(url)
+        self._connection.add_termination_listener(self._stop_listening)
+        await self._connection.add_listener(INVALIDATION_CHANNEL, self._on_notification)
+        self.clear()
+        self.listening = True
+
+    async def _disconnect(self) -> None:
+        self._stop_listening()
+        if self._connection is not None:
+            self._connection.terminate()
+            self._connection = None
+
+    async def _run(self, url: str) -> None:
+        while True:
+            try:
+                if self._connection is None or self._connection.is_closed():
+                    await self._disconnect()
+                    await self._connect(url=url)
+                else:
+                    # A connection that died silently raises here instead of quietly missing invalidations
+                    await self._connection.execute("SELECT 1", timeout=self.check_interval)
+            except Exception:
+                await self._disconnect()
+                logger.exception("Principal cache invalidation listener failed, the cache is bypassed")
+            await asyncio.sleep(self.check_interval)
+
+    def start(self, url: str) -> None:
+        if self._task is None:
+            # asyncpg itself, not through SQLAlchemy: the URL without the +asyncpg driver suffix
+            url = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+            self._task = asyncio.create_task(self._run(url=url))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._disconnect()
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "listening": self.listening,
+        }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_SIZE,
+    check_interval=settings.PRINCIPAL_CACHE_CHECK_SECONDS,
+)
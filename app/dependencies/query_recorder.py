@@ -0,0 +1,73 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryRecorder:
+    def __init__(self, parent: "QueryRecorder | None" = None):
+        self.parent = parent
+        self.statements: list[str] = []
+
+    def record(self, statement: str) -> None:
+        self.statements.append(_WHITESPACE.sub(" ", statement).strip())
+        if self.parent is not None:
+            self.parent.record(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 2) -> dict[str, int]:
+        # Statements are parametrized, so identical text means the same statement shape ran again
+        return {statement: count for statement, count in Counter(self.statements).items() if count >= threshold}
+
+
+current_query_recorder: ContextVar[QueryRecorder | None] = ContextVar("current_query_recorder", default=None)
+
+
+def record_statement(statement: str) -> None:
+    recorder = current_query_recorder.get()
+    if recorder is not None:
+        recorder.record(statement)
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    recorder = QueryRecorder(parent=current_query_recorder.get())
+    token = current_query_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        current_query_recorder.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def assert_query_budget(recorder: QueryRecorder, max_statements: int, max_repeats: int | None = None) -> None:
+    problems = []
+    if recorder.count > max_statements:
+        problems.append(f"ran {recorder.count} statements, budget is {max_statements}")
+    if max_repeats is not None:
+        for statement, count in recorder.repeated(threshold=max_repeats + 1).items():
+            problems.append(f"ran {count} times, budget is {max_repeats}: {statement}")
+    if problems:
+        listing = "\n".join(f"  {statement}" for statement in recorder.statements)
+        raise QueryBudgetExceeded("; ".join(problems) + f"\nStatements:\n{listing}")
+
+
+@contextmanager
+def query_budget(max_statements: int, max_repeats: int | None = None) -> Iterator[QueryRecorder]:
+    """Fails with QueryBudgetExceeded if the wrapped code runs more statements than allowed, e.g.
+
+        with query_budget(max_statements=3, max_repeats=1):
+            await client.get("/users/user/", params={"user_id": user_id}, headers=headers)
+    """
+    with record_queries() as recorder:
+        yield recorder
+    assert_query_budget(recorder, max_statements=max_statements, max_repeats=max_repeats)
@@ -0,0 +1,107 @@
+import time
+from collections import OrderedDict
+
+from fastapi import Form, Request
+
+from app.config.config import settings
+from app.config.exceptions import TooManyRequestsException, ServerBusyException
+from app.dependencies.password_hasher import PasswordHasher, password_hasher
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float):
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def allow(self, key: str) -> bool:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(tokens=self.burst, updated_at=now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+            bucket.updated_at = now
+            self._buckets.move_to_end(key)
+        if bucket.tokens < 1:
+            return False
+        bucket.tokens -= 1
+        return True
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class AuthAdmission:
+    def __init__(self, ip_limiter: RateLimiter, username_limiter: RateLimiter, hasher: PasswordHasher):
+        self.ip_limiter = ip_limiter
+        self.username_limiter = username_limiter
+        self.hasher = hasher
+        self.admitted = 0
+        self.rejected_ip = 0
+        self.rejected_username = 0
+        self.rejected_busy = 0
+
+    def check(self, client_ip: str, username: str | None = None) -> None:
+        # Overload is checked first so requests shed with 503 do not drain anyone's bucket
+        if self.hasher.is_saturated:
+            self.rejected_busy += 1
+            raise ServerBusyException
+        if not self.ip_limiter.allow(client_ip):
+            self.rejected_ip += 1
+            raise TooManyRequestsException
+        if username is not None and not self.username_limiter.allow(username.lower()):
+            self.rejected_username += 1
+            raise TooManyRequestsException
+        self.admitted += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "admitted": self.admitted,
+            "rejected_ip": self.rejected_ip,
+            "rejected_username": self.rejected_username,
+            "rejected_busy": self.rejected_busy,
+            "tracked_ips": len(self.ip_limiter),
+            "tracked_usernames": len(self.username_limiter),
+            "password_operations_pending": self.hasher.pending,
+        }
+
+
+auth_admission = AuthAdmission(
+    ip_limiter=RateLimiter(
+        rate=settings.AUTH_RATE_LIMIT_IP_PER_SECOND,
+        burst=settings.AUTH_RATE_LIMIT_IP_BURST,
+        max_keys=settings.AUTH_RATE_LIMIT_MAX_KEYS,
+    ),
+    username_limiter=RateLimiter(
+        rate=settings.AUTH_RATE_LIMIT_USERNAME_PER_SECOND,
+        burst=settings.AUTH_RATE_LIMIT_USERNAME_BURST,
+        max_keys=settings.AUTH_RATE_LIMIT_MAX_KEYS,
+    ),
+    hasher=password_hasher,
+)
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+# async so they run on the event loop: the limiters' buckets are not safe to update from threadpool workers
+async def login_admission(request: Request, username: str = Form()) -> None:
+    auth_admission.check(client_ip=_client_ip(request), username=username)
+
+
+async def register_admission(request: Request) -> None:
+    auth_admission.check(client_ip=_client_ip(request))
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.config import settings
+from app.config.logger import logger
+from app.domain.models import RevokedToken
+
+# Rows are re-read for this long after the newest one seen, so a revocation committed
+# by a slower transaction with an older created_at is not skipped
+REFRESH_LOOKBACK = timedelta(seconds=60)
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _to_timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    def __init__(self, refresh_interval: float = 5, prune_interval: float = 600):
+        self.refresh_interval = refresh_interval
+        self.prune_interval = prune_interval
+        self._revoked: dict[str, float] = {}
+        self._watermark: datetime | None = None
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti in self._revoked
+
+    async def revoke(self, jti: str, expires_at: float, session: AsyncSession) -> None:
+        statement = insert(RevokedToken).values(
+            jti=jti,
+            expires_at=_to_datetime(expires_at),
+        ).on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        await session.execute(statement)
+        await session.commit()
+        self._revoked[jti] = expires_at
+
+    async def refresh(self, session: AsyncSession) -> None:
+        statement = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.created_at)
+        if self._watermark is None:
+            statement = statement.where(RevokedToken.expires_at > _to_datetime(time.time()))
+        else:
+            statement = statement.where(RevokedToken.created_at >= self._watermark - REFRESH_LOOKBACK)
+        for jti, expires_at, created_at in (await session.execute(statement)).all():
+            self._revoked[jti] = _to_timestamp(expires_at)
+            if self._watermark is None or created_at > self._watermark:
+                self._watermark = created_at
+        if self._watermark is None:
+            self._watermark = datetime.min + REFRESH_LOOKBACK
+
+    def prune_local(self) -> None:
+        now = time.time()
+        self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+
+    async def prune(self, session: AsyncSession) -> None:
+        await session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= _to_datetime(time.time())))
+        await session.commit()
+        self.prune_local()
+
+    async def _run(self, session_factory: async_sessionmaker) -> None:
+        last_prune = time.monotonic()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                async with session_factory() as session:
+                    await self.refresh(session=session)
+                    if time.monotonic() - last_prune >= self.prune_interval:
+                        await self.prune(session=session)
+                        last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Failed to refresh token revocation list")
+
+    def start(self, session_factory: async_sessionmaker) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory=session_factory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+revocation_list = RevocationList(
+    refresh_interval=settings.REVOCATION_REFRESH_SECONDS,
+    prune_interval=settings.REVOCATION_PRUNE_SECONDS,
+)
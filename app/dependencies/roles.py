@@ -0,0 +1,46 @@
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.config import settings
+from app.domain.models import Role, RoleEnum
+from app.domain.schemas.role import Role as RoleSchema
+
+
+class RoleRegistry:
+    def __init__(self, min_reload_interval: float = 30):
+        self.min_reload_interval = min_reload_interval
+        self._by_id: dict[int, RoleSchema] = {}
+        self._by_name: dict[RoleEnum, RoleSchema] = {}
+        self._loaded_at: float | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._by_id)
+
+    async def load(self, session: AsyncSession) -> None:
+        result = await session.execute(select(Role))
+        roles = [RoleSchema.model_validate(role) for role in result.scalars().all()]
+        self._by_id = {role.id: role for role in roles}
+        self._by_name = {role.name: role for role in roles}
+        self._loaded_at = time.monotonic()
+
+    async def reload(self, session: AsyncSession) -> None:
+        # Reloads on a miss are spaced out, a user with a deleted role would otherwise cost a query per request
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.min_reload_interval:
+            return
+        await self.load(session=session)
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if not self.is_loaded:
+            await self.load(session=session)
+
+    def get(self, role_id: int) -> RoleSchema | None:
+        return self._by_id.get(role_id)
+
+    def get_by_name(self, name: RoleEnum) -> RoleSchema | None:
+        return self._by_name.get(name)
+
+
+role_registry = RoleRegistry(min_reload_interval=settings.ROLE_RELOAD_MIN_INTERVAL_SECONDS)
@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+from typing import Iterable
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from app.config.config import settings
+from app.domain.schemas.user import User as UserSchema, UserPage
+
+
+class UserRow(TypedDict):
+    name: str
+    surname: str
+    username: str
+    email: str
+    image_path: str | None
+    id: uuid.UUID
+    role_id: int
+    is_blocked: bool
+    is_active: bool
+    created_at: datetime
+    modified_at: datetime
+
+
+class UserPageRow(TypedDict):
+    items: list[UserRow]
+    total: int
+    has_more: bool
+    next_page: int | None
+    next_cursor: str | None
+
+
+USER_ROW_FIELDS = tuple(UserRow.__annotations__)
+
+# Built once at import, the core schema is what makes per-request validation and dumping cheap
+users_adapter = TypeAdapter(list[UserSchema])
+user_rows_adapter = TypeAdapter(list[UserRow])
+user_page_adapter = TypeAdapter(UserPage)
+user_page_rows_adapter = TypeAdapter(UserPageRow)
+
+
+def _as_rows(users: Iterable) -> list[dict]:
+    # Rows come straight from our own database and were validated on write, so they are only serialized
+    return [{field: getattr(user, field) for field in USER_ROW_FIELDS} for user in users]
+
+
+def dump_users(users: Iterable) -> bytes:
+    if settings.TRUSTED_SERIALIZATION:
+        return user_rows_adapter.dump_json(_as_rows(users))
+    return users_adapter.dump_json(users_adapter.validate_python(users, from_attributes=True))
+
+
+def dump_user_page(page: UserPage) -> bytes:
+    fields = {
+        "total": page.total,
+        "has_more": page.has_more,
+        "next_page": page.next_page,
+        "next_cursor": page.next_cursor,
+    }
+    if settings.TRUSTED_SERIALIZATION:
+        return user_page_rows_adapter.dump_json({"items": _as_rows(page.items), **fields})
+    return user_page_adapter.dump_json(
+        user_page_adapter.validate_python({"items": page.items, **fields}, from_attributes=True)
+    )
+
+
+def users_response(users: Iterable, headers: dict[str, str] | None = None) -> Response:
+    return Response(content=dump_users(users), media_type="application/json", headers=headers)
+
+
+def user_page_response(page: UserPage, headers: dict[str, str] | None = None) -> Response:
+    return Response(content=dump_user_page(page), media_type="application/json", headers=headers)
@@ -1,16 +1,40 @@
 from uuid import UUID
 
-from sqlalchemy import select, Result
+from sqlalchemy import select, update, delete, insert, Result, ColumnElement, and_, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
 
-from app.config.exceptions import UserAlreadyExistsException, PasswordNotValidException, UserNotFoundException
-from app.dependencies.utils import password_check_complexity, hash_password
+from app.config.exceptions import (UserAlreadyExistsException, PasswordNotValidException, UserNotFoundException,
+                                   RoleNotFoundException)
+from app.dependencies.password_hasher import password_hasher
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.utils import password_check_complexity
 from app.domain.models import User
-from app.domain.schemas.user import UserUpdatePartial, UserUpdatePartialAdmin
+from app.domain.schemas.user import UserUpdatePartial, UserUpdatePartialAdmin, UserSelection, User as UserSchema
+
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def user_selection_clause(selection: UserSelection, exclude_id: UUID | None = None) -> ColumnElement[bool]:
+    conditions = []
+    if selection.ids is not None:
+        # A single array parameter instead of one bind per id
+        conditions.append(User.id == any_(bindparam("ids", selection.ids, type_=ARRAY(PG_UUID(as_uuid=True)))))
+    if selection.filter_by_name is not None:
+        conditions.append(User.name == selection.filter_by_name)
+    if selection.filter_by_role_id is not None:
+        conditions.append(User.role_id == selection.filter_by_role_id)
+    if exclude_id is not None:
+        conditions.append(User.id != exclude_id)
+    return and_(*conditions)
 
 
 async def get_user_by_id(user_id: UUID, session: AsyncSession) -> User:
-    statement = select(User).where(User.id == user_id)
+    # Callers return the user schema, which has no roles, so the selectin load would be a wasted query
+    statement = select(User).where(User.id == user_id).options(noload(User.roles))
     result: Result = await session.execute(statement)
     user = result.scalar_one_or_none()
     if user:
@@ -19,33 +43,68 @@ async def get_user_by_id(user_id: UUID, session: AsyncSession) -> User:
         raise UserNotFoundException
 
 
-async def user_update_partial(
+async def execute_user_write(statement, session: AsyncSession) -> Result:
+    # Uniqueness and role existence are left to the database constraints, there is no check-then-write window
+    try:
+        return await session.execute(statement.execution_options(synchronize_session=False))
+    except IntegrityError as error:
+        await session.rollback()
+        sqlstate = getattr(error.orig, "sqlstate", None)
+        if sqlstate == UNIQUE_VIOLATION:
+            raise UserAlreadyExistsException from error
+        if sqlstate == FOREIGN_KEY_VIOLATION:
+            raise RoleNotFoundException from error
+        raise
+
+
+async def insert_user(user_data: dict, session: AsyncSession) -> UserSchema:
+    statement = insert(User).values(**user_data).returning(*User.__table__.c)
+    user = UserSchema.model_validate((await execute_user_write(statement, session=session)).one())
+    await session.commit()
+    return user
+
+
+async def update_user_where(
+        condition: ColumnElement[bool],
         user_update: UserUpdatePartial | UserUpdatePartialAdmin,
         session: AsyncSession,
-        user: User,
-) -> User:
-    if user_update.username and user_update.username != user.username:
-        statement = select(User).where(User.username == user_update.username)
-        check_user = (await session.execute(statement)).scalar_one_or_none()
-        if check_user:
-            raise UserAlreadyExistsException
-
-    if user_update.email and user_update.email != user.email:
-        statement = select(User).where(User.email == user_update.email)
-        check_user = (await session.execute(statement)).scalar_one_or_none()
-        if check_user:
-            raise UserAlreadyExistsException
-
-    user_data = user_update.model_dump(exclude_unset=True)
-    if user_data.get("password"):
+) -> UserSchema:
+    # Unset and null fields are left alone, False and empty values are applied
+    user_data = user_update.model_dump(exclude_unset=True, exclude_none=True)
+    if "password" in user_data:
         if not password_check_complexity(user_data["password"]):
             raise PasswordNotValidException
-        user_data["password"] = hash_password(user_data["password"])
+        user_data["password"] = await password_hasher.hash(user_data["password"])
+    if not user_data:
+        user = (await session.execute(select(User).where(condition))).scalar_one_or_none()
+        if user is None:
+            raise UserNotFoundException
+        return UserSchema.model_validate(user)
 
-    for key, value in user_data.items():
-        if user_data.get(key):
-            setattr(user, key, value)
-    session.add(user)
+    # The joined copy of the row still holds the pre-update values, so the old username comes back too.
+    # Built on the table, ORM-enabled UPDATE drops RETURNING columns of other FROM entries
+    users = User.__table__
+    previous = users.alias("previous")
+    statement = (
+        update(users)
+        .where(condition, previous.c.id == users.c.id)
+        .values(**user_data)
+        .returning(*users.c, previous.c.username.label("previous_username"))
+    )
+    row = (await execute_user_write(statement, session=session)).one_or_none()
+    if row is None:
+        raise UserNotFoundException
+    await principal_cache.publish((row.previous_username, row.username), session=session)
     await session.commit()
-    await session.refresh(user)
-    return user
+    principal_cache.invalidate(row.previous_username, row.username)
+    return UserSchema.model_validate(row)
+
+
+async def delete_user_where(condition: ColumnElement[bool], session: AsyncSession) -> None:
+    statement = delete(User).where(condition).returning(User.username)
+    username = (await execute_user_write(statement, session=session)).scalar_one_or_none()
+    if username is None:
+        raise UserNotFoundException
+    await principal_cache.publish((username,), session=session)
+    await session.commit()
+    principal_cache.invalidate(username)
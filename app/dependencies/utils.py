@@ -1,13 +1,18 @@
+import base64
+import json
 import re
+import time
 import uuid
 import jwt
 import bcrypt
-from sqlalchemy import select, desc, Select
+from sqlalchemy import select, desc, Select, Column, ColumnElement, tuple_, func, or_, case, literal
 
 from app.config.config import settings
 from datetime import timedelta, datetime
 
-from app.config.exceptions import InvalidTokenException
+from app.config.exceptions import InvalidTokenException, InvalidPaginationException
+from app.dependencies.keys import key_manager
+from app.dependencies.metrics import jwt_duration_seconds
 from app.domain.models import User
 from app.domain.schemas.pagination_info import PaginationInfo, Order
 
@@ -36,8 +41,8 @@ REFRESH_TOKEN_TYPE = "refresh"
 
 def encode_jwt(
         payload: dict,
-        private_key: str = settings.PRIVATE_KEY_PATH.read_text(),
-        algorithm: str = settings.ALGORITHM,
+        private_key=None,
+        algorithm: str | None = None,
         expire_minutes: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES,
         expire_timedelta: timedelta | None = None,
 ) -> str:
@@ -52,25 +57,41 @@ def encode_jwt(
         iat=now,
         jti=str(uuid.uuid4())  # for jwt blacklist
     )
+    headers = None
+    if private_key is None:
+        signing_key = key_manager.signing_key
+        private_key, algorithm = signing_key.private_key, signing_key.algorithm
+        headers = {"kid": signing_key.kid}
+    start = time.perf_counter()
     encoded_jwt = jwt.encode(
         to_encode,
         private_key,
-        algorithm=algorithm
+        algorithm=algorithm or settings.ALGORITHM,
+        headers=headers,
     )
+    jwt_duration_seconds.observe(time.perf_counter() - start, "sign")
     return encoded_jwt
 
 
 def decode_jwt(
         token: str | bytes,
-        public_key: str = settings.PUBLIC_KEY_PATH.read_text(),
-        algorithm: str = settings.ALGORITHM,
+        public_key=None,
+        algorithm: str | None = None,
 ) -> dict:
     try:
-        return jwt.decode(
+        if public_key is None:
+            verification_key = key_manager.get_verification_key(jwt.get_unverified_header(token).get("kid"))
+            if verification_key is None:
+                raise InvalidTokenException
+            public_key, algorithm = verification_key.public_key, verification_key.algorithm
+        start = time.perf_counter()
+        payload = jwt.decode(
             token,
             public_key,
-            algorithms=[algorithm],
+            algorithms=[algorithm or settings.ALGORITHM],
         )
+        jwt_duration_seconds.observe(time.perf_counter() - start, "verify")
+        return payload
     except Exception as e:
         raise InvalidTokenException
 
@@ -90,11 +111,17 @@ def create_jwt(
     )
 
 
-def create_access_token(user: User) -> str:
+def new_session_id() -> str:
+    return str(uuid.uuid4())
+
+
+def create_access_token(user: User, sid: str | None = None) -> str:
+    # sid ties the token to the login it came from, revoking the sid revokes every token of that login
     jwt_payload = {
         "sub": user.username,
         "username": user.username,
         "email": user.email,
+        "sid": sid,
     }
     return create_jwt(
         token_type=ACCESS_TOKEN_TYPE,
@@ -103,9 +130,10 @@ def create_access_token(user: User) -> str:
     )
 
 
-def create_refresh_token(user: User) -> str:
+def create_refresh_token(user: User, sid: str | None = None) -> str:
     jwt_payload = {
-        "sub": user.username
+        "sub": user.username,
+        "sid": sid,
     }
     return create_jwt(
         token_type=REFRESH_TOKEN_TYPE,
@@ -114,13 +142,107 @@ def create_refresh_token(user: User) -> str:
     )
 
 
-def make_statement(pagination: PaginationInfo, model) -> Select:
+FILTER_FIELDS = ("role_id", "is_blocked", "is_active")
+
+
+def get_sort_column(pagination: PaginationInfo, model) -> Column:
+    return model.__table__.c[pagination.sort_by.value]
+
+
+def get_sort_key(pagination: PaginationInfo, model) -> tuple[Column, ...]:
+    # Unique columns order rows on their own, the others need id as a tiebreaker to give a stable order
+    sort_column = get_sort_column(pagination=pagination, model=model)
+    return (sort_column,) if sort_column.unique else (sort_column, model.__table__.c.id)
+
+
+def encode_cursor(pagination: PaginationInfo, model, row) -> str:
+    sort_column = get_sort_column(pagination=pagination, model=model)
+    value = getattr(row, sort_column.key)
+    if isinstance(value, (datetime, uuid.UUID)):
+        value = str(value) if isinstance(value, uuid.UUID) else value.isoformat()
+    cursor = json.dumps([sort_column.key, value, str(row.id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(cursor.encode()).decode().rstrip("=")
+
+
+def decode_cursor(pagination: PaginationInfo, model) -> tuple:
+    sort_column = get_sort_column(pagination=pagination, model=model)
+    try:
+        cursor = base64.urlsafe_b64decode(pagination.cursor + "=" * (-len(pagination.cursor) % 4))
+        sort_key, value, last_id = json.loads(cursor)
+        if sort_key != sort_column.key:
+            raise ValueError("Cursor was issued for another sort field")
+        python_type = sort_column.type.python_type
+        if python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif python_type is uuid.UUID:
+            value = uuid.UUID(value)
+        return value, uuid.UUID(last_id)
+    except (ValueError, TypeError):
+        raise InvalidPaginationException
+
+
+SEARCH_FIELDS = ("username", "email", "name", "surname")
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def make_search(search: str, model) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    # Both operators are served by the gin_trgm_ops indexes: ILIKE for prefixes, <% (word similarity) for typos
+    query = literal(search.lower())
+    pattern = f"{escape_like(search)}%"
+    columns = [model.__table__.c[field] for field in SEARCH_FIELDS]
+    condition = or_(*(column.ilike(pattern, escape="\\") for column in columns),
+                    *(query.op("<%")(column) for column in columns))
+    # Prefix hits rank above fuzzy ones, which are ordered by their best word similarity
+    rank = func.greatest(*(
+        case((column.ilike(pattern, escape="\\"), 1.0), else_=func.word_similarity(query, column))
+        for column in columns
+    ))
+    return condition, rank
+
+
+def make_filtered_statement(pagination: PaginationInfo, model) -> Select:
+    # The rows a listing pages through, without order or page bounds, so counts can share it
     statement = select(model)
-    statement = (
-        statement.offset(offset=(pagination.page - 1) * pagination.limit).limit(limit=pagination.limit)
-        if pagination.filter_by_name is None
-        else statement.filter(model.name == pagination.filter_by_name).limit(limit=pagination.limit)
-    )
-    statement = statement.order_by(pagination.sort_by) if pagination.order_by is Order.ASC else statement.order_by(
-        desc(pagination.sort_by))
+    if pagination.filter_by_name is not None:
+        statement = statement.filter(model.name == pagination.filter_by_name)
+    for field in FILTER_FIELDS:
+        value = getattr(pagination, field)
+        if value is not None:
+            statement = statement.where(model.__table__.c[field] == value)
+    if pagination.search is not None:
+        condition, _ = make_search(search=pagination.search, model=model)
+        statement = statement.where(condition)
     return statement
+
+
+def make_statement(pagination: PaginationInfo, model) -> Select:
+    statement = make_filtered_statement(pagination=pagination, model=model)
+    # Every mode reads one extra row, it tells whether there is a next page without counting
+    offset = (pagination.page - 1) * pagination.limit
+
+    if pagination.search is not None:
+        # Relevance is not a stable key to resume from, so search results are paged by offset
+        if pagination.is_cursor:
+            raise InvalidPaginationException
+        _, rank = make_search(search=pagination.search, model=model)
+        statement = statement.order_by(desc(rank), model.id)
+        return statement.offset(offset=offset).limit(limit=pagination.limit + 1)
+
+    sort_key = get_sort_key(pagination=pagination, model=model)
+    statement = statement.order_by(
+        *(sort_key if pagination.order_by is Order.ASC else (desc(column) for column in sort_key))
+    )
+    if not pagination.is_cursor:
+        return statement.offset(offset=offset).limit(limit=pagination.limit + 1)
+
+    # Keyset pagination: the sort key of the last row seen, so every page costs one index range scan
+    if any(column.nullable for column in sort_key):
+        raise InvalidPaginationException
+    if pagination.cursor is not None:
+        value, last_id = decode_cursor(pagination=pagination, model=model)
+        position, last = (sort_key[0], value) if len(sort_key) == 1 else (tuple_(*sort_key), (value, last_id))
+        statement = statement.where(position > last if pagination.order_by is Order.ASC else position < last)
+    return statement.limit(limit=pagination.limit + 1)
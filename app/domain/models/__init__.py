@@ -1,10 +1,12 @@
 from .base import Base
 from .role import Role, RoleEnum
 from .user import User
+from .revoked_token import RevokedToken
 
 __all__ = (
     'Base',
     'Role',
     'User',
     'RoleEnum',
+    'RevokedToken',
 )
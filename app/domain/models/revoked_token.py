@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import String, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.domain.models import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_created_at", "created_at"),
+    )
+
+    jti: Mapped[str] = mapped_column(String(36), nullable=False, unique=True)
+    expires_at: Mapped[datetime] = mapped_column(nullable=False, index=True)
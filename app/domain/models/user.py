@@ -1,7 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from app.domain.models import Base
@@ -12,6 +12,17 @@ if TYPE_CHECKING:
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Sorting on non-unique fields, id breaks ties so keyset pages are stable
+        Index("ix_users_name_id", "name", "id"),
+        Index("ix_users_surname_id", "surname", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_id", "role_id"),
+        *(
+            Index(f"ix_users_{field}_trgm", field, postgresql_using="gin", postgresql_ops={field: "gin_trgm_ops"})
+            for field in ("username", "email", "name", "surname")
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(16), nullable=False)
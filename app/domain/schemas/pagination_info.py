@@ -8,9 +8,40 @@ class Order(Enum):
     DESC = "DESC"
 
 
+class PaginationMode(Enum):
+    OFFSET = "OFFSET"
+    CURSOR = "CURSOR"
+
+
+class SortField(Enum):
+    # Each one is backed by an index that ends in id (or is unique), see the users model
+    USERNAME = "username"
+    EMAIL = "email"
+    NAME = "name"
+    SURNAME = "surname"
+    CREATED_AT = "created_at"
+
+
+class CountStrategy(Enum):
+    EXACT = "EXACT"
+    ESTIMATED = "ESTIMATED"
+    CACHED = "CACHED"
+
+
 class PaginationInfo(BaseModel):
     page: int = Field(1, ge=1)
     limit: int = Field(30, ge=1)
     filter_by_name: str | None = None
-    sort_by: str | None = "username"
+    role_id: int | None = None
+    is_blocked: bool | None = None
+    is_active: bool | None = None
+    sort_by: SortField = SortField.USERNAME
     order_by: Order = "DESC"
+    mode: PaginationMode = PaginationMode.OFFSET
+    cursor: str | None = None
+    search: str | None = Field(None, min_length=1, max_length=128)
+    count: CountStrategy = CountStrategy.ESTIMATED
+
+    @property
+    def is_cursor(self) -> bool:
+        return self.mode is PaginationMode.CURSOR or self.cursor is not None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+from app.domain.models import RoleEnum
+
+
+class Role(BaseModel):
+    id: int
+    name: RoleEnum
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,10 @@
 import uuid
 from datetime import datetime
+from enum import Enum
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
+
+from app.domain.schemas.role import Role
 
 
 class UserBase(BaseModel):
@@ -37,6 +40,64 @@ class User(UserBase):
     modified_at: datetime = Field(default_factory=datetime.now)
 
 
+class UserWithRole(User):
+    roles: Role
+
+
+class UserPage(BaseModel):
+    items: list[User]
+    total: int
+    has_more: bool
+    next_page: int | None = None
+    next_cursor: str | None = None
+
+
+class BulkCreateStatus(Enum):
+    CREATED = "created"
+    CONFLICT = "conflict"
+    DUPLICATE = "duplicate"
+    INVALID_PASSWORD = "invalid_password"
+
+
+class BulkCreateItem(BaseModel):
+    index: int
+    username: str
+    status: BulkCreateStatus
+    user: User | None = None
+
+
+class BulkCreateResult(BaseModel):
+    created: int
+    failed: int
+    items: list[BulkCreateItem]
+
+
+class UserSelection(BaseModel):
+    ids: list[uuid.UUID] | None = Field(None, min_length=1)
+    filter_by_name: str | None = None
+    filter_by_role_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "UserSelection":
+        # An empty selection would match every user
+        if self.ids is None and self.filter_by_name is None and self.filter_by_role_id is None:
+            raise ValueError("ids or at least one filter is required")
+        return self
+
+
+class BulkBlockUsers(UserSelection):
+    is_blocked: bool = True
+
+
+class BulkChangeRole(UserSelection):
+    role_id: int = Field(ge=0)
+
+
+class BulkResult(BaseModel):
+    affected: int
+    ids: list[uuid.UUID]
+
+
 class CurrentUser(UserBase):
     iat: datetime = None
 
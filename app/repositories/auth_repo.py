@@ -16,11 +16,11 @@ class AuthRepo(BaseAuthRepo):
     async def signup_user(self, user: User) -> Token:
         return await self.auth_use_cases.signup_user(user=user)
 
-    async def refresh_jwt(self, user: User) -> Token:
-        return await self.auth_use_cases.refresh_jwt(user=user)
+    async def refresh_jwt(self, payload: dict, user: User) -> Token:
+        return await self.auth_use_cases.refresh_jwt(payload=payload, user=user)
 
-    async def logout_user(self, response: Response) -> None:
-        return await self.auth_use_cases.logout_user(response=response)
+    async def logout_user(self, payload: dict, response: Response, session: AsyncSession) -> None:
+        return await self.auth_use_cases.logout_user(payload=payload, response=response, session=session)
 
     async def get_current_user(self, payload: dict, user: User) -> CurrentUser:
         return await self.auth_use_cases.get_current_user(payload=payload, user=user)
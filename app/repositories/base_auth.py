@@ -15,11 +15,11 @@ class BaseAuthRepo(ABC):
         ...
 
     @abstractmethod
-    async def refresh_jwt(self, user: User) -> Token:
+    async def refresh_jwt(self, payload: dict, user: User) -> Token:
         ...
 
     @abstractmethod
-    async def logout_user(self, response: Response) -> None:
+    async def logout_user(self, payload: dict, response: Response, session: AsyncSession) -> None:
         ...
 
     @abstractmethod
@@ -3,17 +3,20 @@ from abc import ABC, abstractmethod
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.schemas.pagination_info import PaginationInfo
-from app.domain.schemas.user import User, UserUpdatePartialAdmin
+from app.domain.schemas.user import (User, UserUpdatePartialAdmin, UserPage, UserSelection, BulkBlockUsers,
+                                     BulkChangeRole, BulkResult)
 
 
 class BaseUserRepo(ABC):
 
     @abstractmethod
-    async def get_user(self, user_id: uuid.UUID, payload: dict, session: AsyncSession) -> User:
+    async def get_user(self, user_id: uuid.UUID, payload: dict, session: AsyncSession,
+                       read_session: AsyncSession) -> User:
         ...
 
     @abstractmethod
-    async def get_all_users(self, payload: dict, pagination: PaginationInfo, session: AsyncSession) -> list[User]:
+    async def get_all_users(self, payload: dict, pagination: PaginationInfo, session: AsyncSession,
+                            read_session: AsyncSession) -> UserPage:
         ...
 
     @abstractmethod
@@ -24,3 +27,15 @@ class BaseUserRepo(ABC):
     @abstractmethod
     async def delete_user(self, payload: dict,  user_id: uuid.UUID, session: AsyncSession) -> dict:
         ...
+
+    @abstractmethod
+    async def bulk_block_users(self, payload: dict, bulk_block: BulkBlockUsers, session: AsyncSession) -> BulkResult:
+        ...
+
+    @abstractmethod
+    async def bulk_change_role(self, payload: dict, bulk_role: BulkChangeRole, session: AsyncSession) -> BulkResult:
+        ...
+
+    @abstractmethod
+    async def bulk_delete_users(self, payload: dict, selection: UserSelection, session: AsyncSession) -> BulkResult:
+        ...
@@ -1,8 +1,11 @@
 import uuid
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.schemas.user import User, UserUpdatePartial, UserCreate
+from app.domain.schemas.export import ExportFormat
+from app.domain.schemas.user import User, UserUpdatePartial, UserCreate, BulkCreateResult
 
 
 class BaseUserCrudRepo(ABC):
@@ -15,10 +18,18 @@ class BaseUserCrudRepo(ABC):
     async def get_all_users(self, session: AsyncSession) -> list[User]:
         ...
 
+    @abstractmethod
+    def export_users(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        ...
+
     @abstractmethod
     async def create_user(self, user_in: UserCreate, session: AsyncSession) -> User:
         ...
 
+    @abstractmethod
+    async def bulk_create_users(self, users_in: list[UserCreate], session: AsyncSession) -> BulkCreateResult:
+        ...
+
     @abstractmethod
     async def update_partial_user(self, user_id: uuid.UUID, user_update: UserUpdatePartial,
                                   session: AsyncSession) -> User:
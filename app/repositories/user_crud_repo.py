@@ -1,8 +1,10 @@
 import uuid
+from typing import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.schemas.user import User, UserCreate, UserUpdatePartial
+from app.domain.schemas.export import ExportFormat
+from app.domain.schemas.user import User, UserCreate, UserUpdatePartial, BulkCreateResult
 from app.repositories.base_user_crud import BaseUserCrudRepo
 from app.use_cases.user_crud import UserCrudUseCases
 
@@ -16,9 +18,15 @@ class UserRepo(BaseUserCrudRepo):
     async def get_all_users(self, session: AsyncSession) -> list[User]:
         return await self.user_crud_use_cases.get_all_users(session=session)
 
+    def export_users(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        return self.user_crud_use_cases.export_users(export_format=export_format)
+
     async def create_user(self, user_in: UserCreate, session: AsyncSession) -> User:
         return await self.user_crud_use_cases.create_user(user_in=user_in, session=session)
 
+    async def bulk_create_users(self, users_in: list[UserCreate], session: AsyncSession) -> BulkCreateResult:
+        return await self.user_crud_use_cases.bulk_create_users(users_in=users_in, session=session)
+
     async def update_partial_user(self, user_id: uuid.UUID, user_update: UserUpdatePartial,
                                   session: AsyncSession) -> User:
         return await self.user_crud_use_cases.update_partial_user(user_id=user_id, user_update=user_update, session=session)
@@ -4,18 +4,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.schemas.pagination_info import PaginationInfo
 from app.repositories.base_user import BaseUserRepo
-from app.domain.schemas.user import User, UserUpdatePartialAdmin
+from app.domain.schemas.user import (User, UserUpdatePartialAdmin, UserPage, UserSelection, BulkBlockUsers,
+                                     BulkChangeRole, BulkResult)
 from app.use_cases.user import UserUseCases
 
 
 class UserRepo(BaseUserRepo):
     user_use_cases = UserUseCases()
 
-    async def get_user(self, user_id: uuid.UUID, payload: dict, session: AsyncSession) -> User:
-        return await self.user_use_cases.get_user(user_id=user_id, payload=payload, session=session)
+    async def get_user(self, user_id: uuid.UUID, payload: dict, session: AsyncSession,
+                       read_session: AsyncSession) -> User:
+        return await self.user_use_cases.get_user(user_id=user_id, payload=payload, session=session,
+                                                  read_session=read_session)
 
-    async def get_all_users(self, payload: dict, pagination: PaginationInfo, session: AsyncSession) -> list[User]:
-        return await self.user_use_cases.get_all_users(payload=payload, session=session, pagination=pagination)
+    async def get_all_users(self, payload: dict, pagination: PaginationInfo, session: AsyncSession,
+                            read_session: AsyncSession) -> UserPage:
+        return await self.user_use_cases.get_all_users(payload=payload, session=session, pagination=pagination,
+                                                       read_session=read_session)
 
     async def update_partial_user(self, payload: dict, user_id: uuid.UUID, user_update: UserUpdatePartialAdmin,
                                   session: AsyncSession) -> User:
@@ -24,3 +29,12 @@ class UserRepo(BaseUserRepo):
 
     async def delete_user(self, payload: dict, user_id: uuid.UUID, session: AsyncSession) -> dict:
         return await self.user_use_cases.delete_user(payload=payload, user_id=user_id, session=session)
+
+    async def bulk_block_users(self, payload: dict, bulk_block: BulkBlockUsers, session: AsyncSession) -> BulkResult:
+        return await self.user_use_cases.bulk_block_users(payload=payload, bulk_block=bulk_block, session=session)
+
+    async def bulk_change_role(self, payload: dict, bulk_role: BulkChangeRole, session: AsyncSession) -> BulkResult:
+        return await self.user_use_cases.bulk_change_role(payload=payload, bulk_role=bulk_role, session=session)
+
+    async def bulk_delete_users(self, payload: dict, selection: UserSelection, session: AsyncSession) -> BulkResult:
+        return await self.user_use_cases.bulk_delete_users(payload=payload, selection=selection, session=session)
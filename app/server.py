@@ -0,0 +1,102 @@
+import asyncio
+import os
+
+import uvicorn
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text, pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config.config import settings, BASE_DIR
+from app.config.logger import logger, setup_logger, shutdown_logger
+
+MIGRATION_LOCK_NAME = "fastapi-shop-api:migrations"
+
+
+def get_workers() -> int:
+    return max(1, settings.SERVER_WORKERS or os.cpu_count() or 1)
+
+
+def get_pool_limits(workers: int) -> tuple[int, int]:
+    # The budget is per database host: every worker has its own pool for the primary and for each replica,
+    # plus one connection to the primary that listens for principal cache invalidations
+    if settings.DB_CONNECTION_BUDGET is None:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    per_worker = settings.DB_CONNECTION_BUDGET // workers - 1
+    if per_worker < 1:
+        raise ValueError(
+            f"DB_CONNECTION_BUDGET={settings.DB_CONNECTION_BUDGET} is less than two connections per worker "
+            f"({workers} workers)"
+        )
+    pool_size = min(settings.DB_POOL_SIZE, per_worker)
+    max_overflow = min(settings.DB_MAX_OVERFLOW, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+def _upgrade(connection: Connection) -> None:
+    config = Config(BASE_DIR / "alembic.ini")
+    config.set_main_option("script_location", str(BASE_DIR / "alembic"))
+    config.attributes["connection"] = connection
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+async def run_migrations() -> None:
+    # Several replicas of the service may start at once, the advisory lock lets one of them migrate and makes the
+    # others wait and then find nothing left to do. The lock is held by the session, so it is released if we die.
+    engine = create_async_engine(settings.get_db_url(), poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": MIGRATION_LOCK_NAME})
+            await connection.commit()
+            try:
+                await connection.run_sync(_upgrade)
+                await connection.commit()
+            finally:
+                await connection.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": MIGRATION_LOCK_NAME}
+                )
+                await connection.commit()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    setup_logger()
+    try:
+        _serve()
+    finally:
+        shutdown_logger()
+
+
+def _serve() -> None:
+    workers = get_workers()
+    pool_size, max_overflow = get_pool_limits(workers)
+    # Workers are spawned processes that build their own settings from the environment
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+    if settings.SERVER_RUN_MIGRATIONS:
+        logger.info("Running database migrations")
+        asyncio.run(run_migrations())
+
+    # One supervisor process: SIGTERM/SIGINT stop accepting connections, let in-flight requests finish for
+    # SERVER_GRACEFUL_TIMEOUT seconds and run the lifespan shutdown that disposes the pools. SIGHUP restarts the
+    # workers one at a time; the pinned uvicorn drains and stops a worker before starting its replacement, so
+    # each restart briefly serves with one worker less.
+    logger.info(f"Starting {workers} workers, database pool {pool_size}+{max_overflow} connections per worker")
+    uvicorn.run(
+        "main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_TIMEOUT,
+        # Workers set up the logging pipeline on startup, uvicorn's own handlers would write synchronously
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,47 @@
+import time
+
 from fastapi import Response
 from pydantic import EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config.exceptions import UserNotFoundException
-from app.dependencies.auth import get_current_user_from_token
-from app.dependencies.user import user_update_partial
-from app.dependencies.utils import create_access_token, create_refresh_token
+from app.config.config import settings
+from app.config.exceptions import InvalidTokenException
+from app.dependencies.revocation import revocation_list
+from app.dependencies.user import update_user_where, delete_user_where
+from app.dependencies.utils import create_access_token, create_refresh_token, new_session_id
+from app.domain.models import User as UserModel
 from app.domain.schemas.user import User, CurrentUser, UserUpdatePartial, Token, CurrentUserUpdate, UserBase
 
 
 class AuthUseCases:
     async def login_user(self, user: User) -> Token:
+        sid = new_session_id()
         return Token(
-            access_token=create_access_token(user=user),
-            refresh_token=create_refresh_token(user=user),
+            access_token=create_access_token(user=user, sid=sid),
+            refresh_token=create_refresh_token(user=user, sid=sid),
             token_type="Bearer"
         )
 
     async def signup_user(self, user: User) -> Token:
+        sid = new_session_id()
         return Token(
-            access_token=create_access_token(user=user),
-            refresh_token=create_refresh_token(user=user),
+            access_token=create_access_token(user=user, sid=sid),
+            refresh_token=create_refresh_token(user=user, sid=sid),
             token_type="Bearer"
         )
 
-    async def refresh_jwt(self, user: User) -> Token:
+    async def refresh_jwt(self, payload: dict, user: User) -> Token:
         return Token(
-            access_token=create_access_token(user=user)
+            access_token=create_access_token(user=user, sid=payload.get("sid"))
         )
 
-    async def logout_user(self, response: Response) -> None:
-        # TODO: Implement logout with adding token into Blacklist
+    async def logout_user(self, payload: dict, response: Response, session: AsyncSession) -> None:
+        if payload.get("jti"):
+            await revocation_list.revoke(jti=payload["jti"], expires_at=payload["exp"], session=session)
+        if payload.get("sid"):
+            # Also revokes the refresh token of this login, no token of it outlives a refresh token issued now
+            expires_at = time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+            await revocation_list.revoke(jti=payload["sid"], expires_at=expires_at, session=session)
         response.delete_cookie("access_token")
         response.delete_cookie("refresh_token")
 
@@ -46,23 +57,23 @@ class AuthUseCases:
 
     async def update_current_user(self, payload: dict, user_update: UserUpdatePartial,
                                   session: AsyncSession) -> CurrentUserUpdate:
-        user = await get_current_user_from_token(payload=payload, session=session)
-        if not user:
-            raise UserNotFoundException
+        username = payload.get("sub")
+        if not username:
+            raise InvalidTokenException
+        user = await update_user_where(condition=UserModel.username == username, user_update=user_update,
+                                       session=session)
+        # Tokens are issued from the updated row, the old ones name a username that no longer exists
         token = Token(
-            access_token=create_access_token(user=user),
-            refresh_token=create_refresh_token(user=user)
-        ) if user_update.username and user_update.username != user.username else None
-        user = await user_update_partial(user=user, user_update=user_update, session=session)
+            access_token=create_access_token(user=user, sid=payload.get("sid")),
+            refresh_token=create_refresh_token(user=user, sid=payload.get("sid"))
+        ) if user.username != username else None
         user_schema = CurrentUserUpdate.model_validate(user)
         user_schema.token = token
         return user_schema
 
     async def delete_current_user(self, payload: dict, session: AsyncSession) -> dict:
-        user = await get_current_user_from_token(payload=payload, session=session)
-        if not user:
-            raise UserNotFoundException
-
-        await session.delete(user)
-        await session.commit()
+        username = payload.get("sub")
+        if not username:
+            raise InvalidTokenException
+        await delete_user_where(condition=UserModel.username == username, session=session)
         return {'message': 'User deleted successfully'}
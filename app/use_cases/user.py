@@ -1,54 +1,112 @@
 import uuid
 
-from sqlalchemy import Result
+from sqlalchemy import Result, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
 
-from app.config.exceptions import PermissionDeniedException
-from app.dependencies.auth import get_current_user_from_token, get_role_from_user
-from app.dependencies.user import get_user_by_id, user_update_partial
-from app.dependencies.utils import make_statement
+from app.config.exceptions import PermissionDeniedException, RoleNotFoundException
+from app.dependencies.auth import get_current_principal, get_role_from_user
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.roles import role_registry
+from app.dependencies.user import get_user_by_id, update_user_where, delete_user_where, user_selection_clause
+from app.dependencies.counts import count_rows
+from app.dependencies.utils import make_statement, make_filtered_statement, encode_cursor
 from app.domain.models import RoleEnum
 from app.domain.schemas.pagination_info import PaginationInfo
-from app.domain.schemas.user import UserUpdatePartialAdmin, User as UserSchema
+from app.domain.schemas.user import (UserUpdatePartialAdmin, User as UserSchema, UserPage, UserSelection,
+                                     BulkBlockUsers, BulkChangeRole, BulkResult)
 from app.domain.models.user import User
 
 
 class UserUseCases:
-    async def get_user(self, user_id: uuid.UUID, payload: dict, session: AsyncSession) -> UserSchema:
-        current_user = await get_current_user_from_token(payload=payload, session=session)
+    async def get_user(self, user_id: uuid.UUID, payload: dict, session: AsyncSession,
+                       read_session: AsyncSession) -> UserSchema:
+        # The principal is resolved on the primary so a lagging replica can never repopulate the principal cache
+        current_user = await get_current_principal(payload=payload, session=session)
         role = await get_role_from_user(user=current_user, session=session)
         if role.name in (RoleEnum.ADMIN, RoleEnum.MODERATOR):
-            return await get_user_by_id(user_id=user_id, session=session)
+            return await get_user_by_id(user_id=user_id, session=read_session)
         else:
             raise PermissionDeniedException
 
-    async def get_all_users(self, payload: dict, pagination: PaginationInfo, session: AsyncSession) -> list[UserSchema]:
-        current_user = await get_current_user_from_token(payload=payload, session=session)
+    async def get_all_users(self, payload: dict, pagination: PaginationInfo, session: AsyncSession,
+                            read_session: AsyncSession) -> UserPage:
+        current_user = await get_current_principal(payload=payload, session=session)
         role = await get_role_from_user(user=current_user, session=session)
         if role.name in (RoleEnum.ADMIN, RoleEnum.MODERATOR):
-            statement = make_statement(pagination=pagination, model=User)
-            result: Result = await session.execute(statement)
-            return list(result.scalars().all())
+            # UserPage does not serialize roles, the selectin relationship would cost a second query per page
+            statement = make_statement(pagination=pagination, model=User).options(noload(User.roles))
+            result: Result = await read_session.execute(statement)
+            users = list(result.scalars().all())
+            has_more = len(users) > pagination.limit
+            users = users[:pagination.limit]
+            next_cursor = next_page = None
+            if has_more and pagination.is_cursor:
+                next_cursor = encode_cursor(pagination=pagination, model=User, row=users[-1])
+            elif has_more:
+                next_page = pagination.page + 1
+            total = await count_rows(
+                statement=make_filtered_statement(pagination=pagination, model=User),
+                strategy=pagination.count,
+                cache_key=(pagination.filter_by_name, pagination.role_id, pagination.is_blocked, pagination.is_active,
+                           pagination.search),
+                session=read_session,
+            )
+            # Left as ORM rows, the response is validated and serialized in one pass by user_page_response
+            return UserPage.model_construct(items=users, total=total, has_more=has_more, next_page=next_page,
+                                            next_cursor=next_cursor)
         else:
             raise PermissionDeniedException
 
     async def update_partial_user(self, payload: dict, user_id: uuid.UUID, user_update: UserUpdatePartialAdmin,
                                   session: AsyncSession) -> UserSchema:
-        current_user = await get_current_user_from_token(payload=payload, session=session)
+        current_user = await get_current_principal(payload=payload, session=session)
         role = await get_role_from_user(user=current_user, session=session)
         if role.name is RoleEnum.ADMIN:
-            user = await get_user_by_id(user_id=user_id, session=session)
-            return await user_update_partial(user=user, session=session, user_update=user_update)
+            return await update_user_where(condition=User.id == user_id, user_update=user_update, session=session)
         else:
             raise PermissionDeniedException
 
     async def delete_user(self, payload: dict, user_id: uuid.UUID, session: AsyncSession) -> dict:
-        current_user = await get_current_user_from_token(payload=payload, session=session)
+        current_user = await get_current_principal(payload=payload, session=session)
         role = await get_role_from_user(user=current_user, session=session)
         if role.name is RoleEnum.ADMIN:
-            user = await get_user_by_id(user_id=user_id, session=session)
-            await session.delete(user)
-            await session.commit()
+            await delete_user_where(condition=User.id == user_id, session=session)
             return {'message': 'User deleted successfully'}
         else:
             raise PermissionDeniedException
+
+    async def _get_admin(self, payload: dict, session: AsyncSession) -> UserSchema:
+        current_user = await get_current_principal(payload=payload, session=session)
+        role = await get_role_from_user(user=current_user, session=session)
+        if role.name is not RoleEnum.ADMIN:
+            raise PermissionDeniedException
+        return current_user
+
+    async def _apply_bulk(self, statement, session: AsyncSession) -> BulkResult:
+        # One statement for the whole selection, the returned usernames are enough to drop cached principals
+        rows = (await session.execute(statement.returning(User.id, User.username).execution_options(
+            synchronize_session=False))).all()
+        if rows:
+            await principal_cache.publish((row.username for row in rows), session=session)
+        await session.commit()
+        principal_cache.invalidate(*(row.username for row in rows))
+        return BulkResult(affected=len(rows), ids=[row.id for row in rows])
+
+    async def bulk_block_users(self, payload: dict, bulk_block: BulkBlockUsers, session: AsyncSession) -> BulkResult:
+        current_user = await self._get_admin(payload=payload, session=session)
+        statement = update(User).where(user_selection_clause(selection=bulk_block, exclude_id=current_user.id))
+        return await self._apply_bulk(statement.values(is_blocked=bulk_block.is_blocked), session=session)
+
+    async def bulk_change_role(self, payload: dict, bulk_role: BulkChangeRole, session: AsyncSession) -> BulkResult:
+        current_user = await self._get_admin(payload=payload, session=session)
+        await role_registry.ensure_loaded(session=session)
+        if role_registry.get(bulk_role.role_id) is None:
+            raise RoleNotFoundException
+        statement = update(User).where(user_selection_clause(selection=bulk_role, exclude_id=current_user.id))
+        return await self._apply_bulk(statement.values(role_id=bulk_role.role_id), session=session)
+
+    async def bulk_delete_users(self, payload: dict, selection: UserSelection, session: AsyncSession) -> BulkResult:
+        current_user = await self._get_admin(payload=payload, session=session)
+        statement = delete(User).where(user_selection_clause(selection=selection, exclude_id=current_user.id))
+        return await self._apply_bulk(statement, session=session)
@@ -1,14 +1,37 @@
+import csv
+import io
+from typing import AsyncIterator
 from uuid import UUID
 
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, Result
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql.expression import or_
 
-from app.config.exceptions import UserAlreadyExistsException, PasswordNotValidException, UserNotFoundException
-from app.dependencies.user import user_update_partial
-from app.dependencies.utils import password_check_complexity, hash_password
-from app.domain.models import User, Role
-from app.domain.schemas.user import UserCreate, UserUpdatePartial, User as UserSchema
+from app.config.config import settings
+from app.config.exceptions import PasswordNotValidException, UserNotFoundException
+from app.dependencies.db import db
+from app.dependencies.roles import role_registry
+from app.dependencies.user import insert_user, update_user_where, delete_user_where
+from app.dependencies.password_hasher import password_hasher
+from app.dependencies.utils import password_check_complexity
+from app.domain.models import User, RoleEnum
+from app.domain.schemas.export import ExportFormat
+from app.domain.schemas.user import (UserCreate, UserUpdatePartial, User as UserSchema, BulkCreateItem,
+                                     BulkCreateResult, BulkCreateStatus)
+
+EXPORT_FIELDS = tuple(UserSchema.model_fields)
+
+
+def _encode_ndjson(rows) -> bytes:
+    return b"".join(to_json(row._asdict()) + b"\n" for row in rows)
+
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
 
 
 class UserCrudUseCases:
@@ -27,39 +50,82 @@ class UserCrudUseCases:
         users = result.scalars().all()
         return list(users)
 
-    async def create_user(self, user_in: UserCreate, session: AsyncSession) -> UserSchema:
-        statement = select(User).where(or_(User.username == user_in.username, User.email == user_in.email))
-        user = (await session.execute(statement)).all()
-        if user:
-            raise UserAlreadyExistsException
+    async def export_users(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        # Plain columns rather than ORM entities, so rows are not kept in the session identity map
+        statement = select(*(User.__table__.c[field] for field in EXPORT_FIELDS)).order_by(User.username)
+        statement = statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        encode = _encode_csv if export_format is ExportFormat.CSV else _encode_ndjson
+        if export_format is ExportFormat.CSV:
+            yield _encode_csv([EXPORT_FIELDS])
 
+        # The response body is sent after request dependencies are closed, so the stream owns its session
+        async with db.read_session() as session:
+            result = await session.stream(statement)
+            async for rows in result.partitions():
+                yield encode(rows)
+
+    async def create_user(self, user_in: UserCreate, session: AsyncSession) -> UserSchema:
         user_data = user_in.model_dump()
         if not password_check_complexity(user_data["password"]):
             raise PasswordNotValidException
-        user_data["password"] = hash_password(user_data["password"])
+        user_data["password"] = await password_hasher.hash(user_data["password"])
 
-        statement = select(Role).where(Role.name == "USER")
-        role = (await session.execute(statement)).scalar_one_or_none()
-        user_data["role_id"] = role.id
+        await role_registry.ensure_loaded(session=session)
+        user_data["role_id"] = role_registry.get_by_name(RoleEnum.USER).id
 
-        user = User(**user_data)
-        session.add(user)
-        await session.commit()
-        return user
+        return await insert_user(user_data=user_data, session=session)
+
+    async def bulk_create_users(self, users_in: list[UserCreate], session: AsyncSession) -> BulkCreateResult:
+        items = [BulkCreateItem(index=index, username=user_in.username, status=BulkCreateStatus.CREATED)
+                 for index, user_in in enumerate(users_in)]
+
+        seen_usernames, seen_emails = set(), set()
+        for item, user_in in zip(items, users_in):
+            if user_in.username in seen_usernames or user_in.email in seen_emails:
+                item.status = BulkCreateStatus.DUPLICATE
+            elif not password_check_complexity(user_in.password):
+                item.status = BulkCreateStatus.INVALID_PASSWORD
+            seen_usernames.add(user_in.username)
+            seen_emails.add(user_in.email)
+
+        statement = select(User.username, User.email).where(or_(
+            User.username.in_(seen_usernames), User.email.in_(seen_emails)
+        ))
+        taken = (await session.execute(statement)).all()
+        taken_usernames = {row.username for row in taken}
+        taken_emails = {row.email for row in taken}
+        for item, user_in in zip(items, users_in):
+            if item.status is BulkCreateStatus.CREATED and (
+                    user_in.username in taken_usernames or user_in.email in taken_emails):
+                item.status = BulkCreateStatus.CONFLICT
+
+        pending = [(item, user_in) for item, user_in in zip(items, users_in) if item.status is BulkCreateStatus.CREATED]
+        if pending:
+            hashed_passwords = await password_hasher.hash_many([user_in.password for _, user_in in pending])
+            await role_registry.ensure_loaded(session=session)
+            role_id = role_registry.get_by_name(RoleEnum.USER).id
+            rows = [
+                {**user_in.model_dump(), "password": hashed_password, "role_id": role_id}
+                for (_, user_in), hashed_password in zip(pending, hashed_passwords)
+            ]
+            # Users created concurrently since the conflict check are skipped here and reported as conflicts
+            statement = insert(User).on_conflict_do_nothing().returning(User)
+            created = {user.username: user for user in await session.scalars(statement, rows)}
+            await session.commit()
+            for item, _ in pending:
+                user = created.get(item.username)
+                if user is None:
+                    item.status = BulkCreateStatus.CONFLICT
+                else:
+                    item.user = UserSchema.model_validate(user)
+
+        created_count = sum(item.status is BulkCreateStatus.CREATED for item in items)
+        return BulkCreateResult(created=created_count, failed=len(items) - created_count, items=items)
 
     async def update_partial_user(self, user_id: UUID, user_update: UserUpdatePartial,
                                   session: AsyncSession) -> UserSchema:
-        user = await self.get_user_by_id(user_id=user_id, session=session)
-        if not user:
-            raise UserNotFoundException
-        user = await user_update_partial(user=user, user_update=user_update, session=session)
-        return user
+        return await update_user_where(condition=User.id == user_id, user_update=user_update, session=session)
 
     async def delete_user(self, user_id: UUID, session: AsyncSession) -> dict:
-        user = await self.get_user_by_id(user_id=user_id, session=session)
-        if not user:
-            raise UserNotFoundException
-
-        await session.delete(user)
-        await session.commit()
+        await delete_user_where(condition=User.id == user_id, session=session)
         return {'message': 'User deleted successfully'}
@@ -0,0 +1,167 @@
+"""Throughput and latency of the hot path of every router.
+
+Seeds --dataset-size users into the configured Postgres (removed again afterwards), then runs each scenario
+with --concurrency workers for --requests requests. Results are written as JSON; with --baseline the run is
+compared against an earlier result file and the exit code is 1 if any scenario regressed:
+
+    python -m benchmarks.hot_paths --output baseline.json
+    python -m benchmarks.hot_paths --baseline baseline.json --output current.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.utils import SEED_PASSWORD as PASSWORD, make_client, remove_seeded_users, seed_users, summarize
+
+# Every scenario comes from one client address and one account, the login limits would turn it into a 429 benchmark
+os.environ.setdefault("AUTH_RATE_LIMIT_IP_BURST", "1000000")
+os.environ.setdefault("AUTH_RATE_LIMIT_IP_PER_SECOND", "1000000")
+os.environ.setdefault("AUTH_RATE_LIMIT_USERNAME_BURST", "1000000")
+os.environ.setdefault("AUTH_RATE_LIMIT_USERNAME_PER_SECOND", "1000000")
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    headers: dict[str, str]
+    refresh_headers: dict[str, str]
+    user_ids: list[uuid.UUID]
+    admin_username: str
+
+
+Scenario = Callable[[Context, int], Awaitable[httpx.Response]]
+
+
+def _user_id(context: Context, i: int) -> str:
+    return str(context.user_ids[i % len(context.user_ids)])
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "auth.login": lambda c, i: c.client.post(
+        "/auth/login/", data={"username": c.admin_username, "password": PASSWORD}
+    ),
+    "auth.me": lambda c, i: c.client.get("/auth/me/", headers=c.headers),
+    "auth.refresh": lambda c, i: c.client.post("/auth/refresh-token/", headers=c.refresh_headers),
+    "users.all": lambda c, i: c.client.get("/users/all/", headers=c.headers),
+    "users.all_cursor": lambda c, i: c.client.get("/users/all/", params={"mode": "CURSOR"}, headers=c.headers),
+    "users.search": lambda c, i: c.client.get("/users/all/", params={"search": "alek"}, headers=c.headers),
+    "users.user": lambda c, i: c.client.get("/users/user/", params={"user_id": _user_id(c, i)}, headers=c.headers),
+    "internal_users.all": lambda c, i: c.client.get("/internal-users/all/"),
+    "internal_users.user": lambda c, i: c.client.get("/internal-users/user/", params={"user_id": _user_id(c, i)}),
+    "internal_users.export": lambda c, i: c.client.get("/internal-users/export/", params={"format": "ndjson"}),
+    "well_known.jwks": lambda c, i: c.client.get("/.well-known/jwks.json"),
+    "stats.db_pool": lambda c, i: c.client.get("/internal-stats/db-pool/"),
+    "metrics": lambda c, i: c.client.get("/metrics"),
+}
+
+
+async def run_scenario(context: Context, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await scenario(context, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {**summarize(latencies, time.perf_counter() - start), "errors": errors}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scenarios = {name: SCENARIOS[name] for name in args.scenario or SCENARIOS}
+    seeded = await seed_users(args.dataset_size)
+    admin_username, user_ids = seeded.admin_username, seeded.user_ids
+    try:
+        async with make_client(args.base_url) as client:
+            response = await client.post("/auth/login/", data={"username": admin_username, "password": PASSWORD})
+            response.raise_for_status()
+            tokens = response.json()
+            context = Context(
+                client=client,
+                headers={"Authorization": f"Bearer {tokens['access_token']}"},
+                refresh_headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+                user_ids=user_ids,
+                admin_username=admin_username,
+            )
+            results = {}
+            for name, scenario in scenarios.items():
+                await run_scenario(context, scenario, args.warmup, args.concurrency)
+                results[name] = await run_scenario(context, scenario, args.requests, args.concurrency)
+                print(f"{name:<24} {results[name]['rps']:>9.1f} rps  p50 {results[name]['p50_ms']:.2f} ms  "
+                      f"p95 {results[name]['p95_ms']:.2f} ms  p99 {results[name]['p99_ms']:.2f} ms", file=sys.stderr)
+    finally:
+        await remove_seeded_users(seeded)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "dataset_size": args.dataset_size,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in current["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f} ms -> {result['p95_ms']:.2f} ms")
+        if result["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['rps']:.1f} rps -> {result['rps']:.1f} rps")
+        if result["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="benchmark a running server instead of main:app in-process")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--dataset-size", type=int, default=1000, help="users seeded before the run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests per scenario")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this earlier result file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown, 0.2 is 20%%")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Sign and verify throughput of RS256 against ES256 and EdDSA.
+
+Keys are generated in memory, so no certs or database are needed:
+
+    python -m benchmarks.jwt_algorithms --iterations 2000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+
+KEY_FACTORIES = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def ops_per_second(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def bench_algorithm(algorithm: str, private_key, iterations: int, payload: dict) -> dict:
+    public_key = private_key.public_key()
+    token = jwt.encode(payload, private_key, algorithm=algorithm)
+    return {
+        "sign_per_second": ops_per_second(lambda: jwt.encode(payload, private_key, algorithm=algorithm), iterations),
+        "verify_per_second": ops_per_second(
+            lambda: jwt.decode(token, public_key, algorithms=[algorithm]), iterations
+        ),
+        "token_bytes": len(token),
+    }
+
+
+def bench_pem_parsing(private_key, iterations: int, payload: dict) -> dict:
+    """What encode_jwt/decode_jwt used to pay: the PEM text is re-parsed on every call."""
+    private_pem = private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    public_pem = private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    token = jwt.encode(payload, private_pem, algorithm="RS256")
+    return {
+        "sign_per_second": ops_per_second(lambda: jwt.encode(payload, private_pem, algorithm="RS256"), iterations),
+        "verify_per_second": ops_per_second(
+            lambda: jwt.decode(token, public_pem, algorithms=["RS256"]), iterations
+        ),
+        "token_bytes": len(token),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    payload = {
+        "type": "access",
+        "sub": "benchmark",
+        "email": "benchmark@example.com",
+        "exp": datetime.now() + timedelta(minutes=5),
+    }
+    keys = {algorithm: factory() for algorithm, factory in KEY_FACTORIES.items()}
+    results = {"RS256 (PEM text)": bench_pem_parsing(keys["RS256"], args.iterations, payload)}
+    for algorithm, private_key in keys.items():
+        results[algorithm] = bench_algorithm(algorithm, private_key, args.iterations, payload)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""p99 latency of /auth/me/ while /auth/login/ is under load.
+
+Needs a reachable Postgres with an existing user:
+
+    python -m benchmarks.login_under_load --username alice --password Secret123
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.utils import make_client, summarize
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post("/auth/login/", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def probe_me(client: httpx.AsyncClient, token: str, duration: float, interval: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/auth/me/", headers={"Authorization": f"Bearer {token}"})
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def hammer_login(client: httpx.AsyncClient, username: str, password: str, deadline: float) -> list[float]:
+    latencies = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.post("/auth/login/", data={"username": username, "password": password})
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with make_client(args.base_url) as client:
+        token = await login(client, args.username, args.password)
+
+        idle = await probe_me(client, token, args.duration, args.interval)
+
+        deadline = time.perf_counter() + args.duration
+        login_tasks = [
+            asyncio.create_task(hammer_login(client, args.username, args.password, deadline))
+            for _ in range(args.concurrency)
+        ]
+        loaded = await probe_me(client, token, args.duration, args.interval)
+        login_latencies = [latency for result in await asyncio.gather(*login_tasks) for latency in result]
+
+    return {
+        "me_idle": summarize(idle, args.duration),
+        "me_under_login_load": summarize(loaded, args.duration),
+        "login": summarize(login_latencies, args.duration),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="benchmark a running server instead of main:app in-process")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent login loops")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between /auth/me/ probes")
+    print(json.dumps(asyncio.run(run(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Query plans and timings of the /users/all/ search mode at a given dataset size.
+
+Seeds --dataset-size users, runs EXPLAIN ANALYZE for each query through make_statement and reports the scans used.
+The exit code is 1 if any query read the users table with a sequential scan, so run it at a realistic size
+(the planner rightly prefers a seq scan on a few hundred rows):
+
+    python -m benchmarks.search --dataset-size 100000 --query alek --query ivanov --query bench_
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.utils import remove_seeded_users, seed_users
+
+
+def collect_scans(plan: dict, scans: list[str]) -> list[str]:
+    if plan["Node Type"].endswith("Scan"):
+        scans.append(f"{plan['Node Type']} on {plan.get('Index Name') or plan.get('Relation Name')}")
+    for child in plan.get("Plans", []):
+        collect_scans(child, scans)
+    return scans
+
+
+async def explain(query: str, limit: int) -> dict:
+    from app.dependencies.db import db
+    from app.dependencies.utils import make_statement
+    from app.domain.models import User
+    from app.domain.schemas.pagination_info import PaginationInfo
+
+    statement = make_statement(pagination=PaginationInfo(search=query, limit=limit), model=User)
+    async with db.session_factory() as session:
+        connection = await session.connection()
+        sql = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+        plan = result.scalar_one()
+    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+    return {
+        "execution_ms": plan["Execution Time"],
+        "rows": plan["Plan"]["Actual Rows"],
+        "scans": collect_scans(plan["Plan"], []),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from app.dependencies.db import db
+
+    seeded = await seed_users(args.dataset_size)
+    try:
+        async with db.session_factory() as session:
+            await (await session.connection()).exec_driver_sql("ANALYZE users")
+            await session.commit()
+        return {query: await explain(query, args.limit) for query in args.query or ["alek"]}
+    finally:
+        await remove_seeded_users(seeded)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset-size", type=int, default=100000, help="users seeded before the run")
+    parser.add_argument("--query", action="append", help="search term, may be repeated")
+    parser.add_argument("--limit", type=int, default=30, help="page size")
+    results = asyncio.run(run(parser.parse_args()))
+    print(json.dumps(results, indent=2))
+
+    seq_scans = [query for query, result in results.items() if "Seq Scan on users" in result["scans"]]
+    if seq_scans:
+        print(f"Sequential scan on users for: {', '.join(seq_scans)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Serialization time per 1,000 users for the list endpoints.
+
+Compares FastAPI's default response_model path with users_response, validated and trusted. No database needed:
+
+    python -m benchmarks.serialization --users 1000 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.config.config import settings
+from app.dependencies.serialization import dump_users
+from app.domain.models import User
+from app.domain.schemas.user import User as UserSchema
+
+
+def make_users(count: int) -> list[User]:
+    now = datetime.now()
+    return [
+        User(
+            id=uuid.uuid4(), name=f"Name{i}", surname=f"Surname{i}", username=f"user{i}", password=b"",
+            email=f"user{i}@example.com", role_id=1, image_path=None, is_blocked=False, is_active=True,
+            created_at=now, modified_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_default(users: list[User]) -> bytes:
+    # What a `-> list[User]` endpoint does: validate, dump to Python objects, then json.dumps
+    field = create_response_field(name="response", type_=list[UserSchema])
+    content = asyncio.run(serialize_response(field=field, response_content=users))
+    return JSONResponse(content).body
+
+
+def users_response_validated(users: list[User]) -> bytes:
+    settings.TRUSTED_SERIALIZATION = False
+    return dump_users(users)
+
+
+def users_response_trusted(users: list[User]) -> bytes:
+    settings.TRUSTED_SERIALIZATION = True
+    return dump_users(users)
+
+
+def measure(serialize, users: list[User], repeat: int) -> float:
+    serialize(users)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        serialize(users)
+    return (time.perf_counter() - start) / repeat / len(users) * 1000 * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000, help="users per response")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    users = make_users(args.users)
+    assert json.loads(fastapi_default(users)) == json.loads(users_response_trusted(users))
+    results = {
+        name: {"ms_per_1000_users": measure(serialize, users, args.repeat)}
+        for name, serialize in (
+            ("fastapi_default", fastapi_default),
+            ("users_response_validated", users_response_validated),
+            ("users_response_trusted", users_response_trusted),
+        )
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cold-start cost: time to import main and time until the first request is answered.
+
+Every sample runs in a fresh interpreter. The first request is GET / after the lifespan startup, which needs the
+configured Postgres; --skip-lifespan measures import plus the first request without it. The exit code is 1 when
+a median is over its budget:
+
+    python -m benchmarks.startup --runs 5 --import-budget-ms 1500 --first-request-budget-ms 3000
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+FIRST_REQUEST_PROBE = """
+import asyncio
+import time
+start = time.perf_counter()
+
+import httpx
+
+from main import app
+
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        if {lifespan}:
+            async with app.router.lifespan_context(app):
+                response = await client.get("/")
+        else:
+            response = await client.get("/")
+    response.raise_for_status()
+
+asyncio.run(first_request())
+print(time.perf_counter() - start)
+"""
+
+
+def sample(probe: str) -> float:
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-lifespan", action="store_true", help="do not run startup hooks, no database needed")
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--first-request-budget-ms", type=float, default=3000)
+    args = parser.parse_args()
+
+    probe = FIRST_REQUEST_PROBE.format(lifespan=not args.skip_lifespan)
+    imports = [sample(IMPORT_PROBE) * 1000 for _ in range(args.runs)]
+    first_requests = [sample(probe) * 1000 for _ in range(args.runs)]
+    results = {
+        "import_ms": {"median": statistics.median(imports), "max": max(imports), "budget": args.import_budget_ms},
+        "first_request_ms": {
+            "median": statistics.median(first_requests),
+            "max": max(first_requests),
+            "budget": args.first_request_budget_ms,
+            "lifespan": not args.skip_lifespan,
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+    over_budget = [name for name, result in results.items() if result["median"] > result["budget"]]
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
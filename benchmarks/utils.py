@@ -0,0 +1,115 @@
+import math
+import random
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple
+
+import httpx
+
+SEED_USERNAME_PREFIX = "bench_"
+SEED_PASSWORD = "Benchmark123"
+SYLLABLES = ("al", "ek", "san", "dr", "ma", "ri", "na", "ol", "ga", "iv", "an", "ov", "ko", "va", "le", "na", "dim",
+             "tri", "ser", "gei", "pe", "tr", "ju", "li", "ya", "mi", "ha", "il", "ka", "te", "ri", "bo", "ris")
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(latencies: list[float], duration: float | None = None) -> dict:
+    summary = {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
+    if duration:
+        summary["rps"] = len(latencies) / duration
+    return summary
+
+
+class SeededUsers(NamedTuple):
+    admin_username: str
+    admin_id: uuid.UUID
+    user_ids: list[uuid.UUID]
+
+
+def fake_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()[:16]
+
+
+async def seed_users(count: int, seed: int = 0) -> SeededUsers:
+    """Inserts an admin plus count users into the configured database, pass the result to remove_seeded_users."""
+    from sqlalchemy import insert
+
+    from app.dependencies.db import db
+    from app.dependencies.roles import role_registry
+    from app.dependencies.utils import hash_password
+    from app.domain.models import RoleEnum, User
+
+    # A tag per run, so leftovers of an interrupted run do not collide with this one
+    run_id = uuid.uuid4().hex[:3]
+    longest = f"{SEED_USERNAME_PREFIX}{run_id}_{count}"
+    if len(longest) > User.username.type.length:
+        raise ValueError(f"{count} users do not fit the username column, {longest!r} is too long")
+    rng = random.Random(seed)
+    hashed_password = hash_password(SEED_PASSWORD)
+    async with db.session_factory() as session:
+        await role_registry.ensure_loaded(session=session)
+        admin_role_id = role_registry.get_by_name(RoleEnum.ADMIN).id
+        user_role_id = role_registry.get_by_name(RoleEnum.USER).id
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "name": fake_name(rng),
+                "surname": fake_name(rng),
+                "username": f"{SEED_USERNAME_PREFIX}{run_id}_{i}",
+                "email": f"{SEED_USERNAME_PREFIX}{run_id}_{i}@example.com",
+                "password": hashed_password,
+                "role_id": admin_role_id if i == 0 else user_role_id,
+                "is_active": True,
+            }
+            for i in range(count + 1)
+        ]
+        # Ids in parameter order, the first one is the admin's
+        statement = insert(User).returning(User.id, sort_by_parameter_order=True)
+        ids = []
+        for start in range(0, len(rows), 1000):
+            ids.extend(await session.scalars(statement, rows[start:start + 1000]))
+        await session.commit()
+    return SeededUsers(admin_username=rows[0]["username"], admin_id=ids[0], user_ids=ids[1:])
+
+
+async def remove_seeded_users(seeded: SeededUsers) -> None:
+    """Deletes exactly the rows seed_users inserted, never matches on names."""
+    from sqlalchemy import delete
+
+    from app.dependencies.db import db
+    from app.domain.models import User
+
+    ids = [seeded.admin_id, *seeded.user_ids]
+    async with db.session_factory() as session:
+        for start in range(0, len(ids), 1000):
+            await session.execute(delete(User).where(User.id.in_(ids[start:start + 1000])))
+        await session.commit()
+
+
+@asynccontextmanager
+async def make_client(base_url: str | None = None) -> AsyncIterator[httpx.AsyncClient]:
+    """Client for a running server when base_url is given, otherwise for main:app served in-process."""
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            yield client
+        return
+
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            yield client
@@ -1,23 +1,65 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from app.config.logger import logger
+from app.config.config import settings
+from app.config.logger import logger, setup_logger, shutdown_logger
+from app.adapters.middlewares import MetricsMiddleware, QueryRecorderMiddleware, RequestIdMiddleware
+from app.adapters.routers.metrics import router as metrics_router
 from app.adapters.routers.auth import router as auth_router
 from app.adapters.routers.users import router as users_router
 from app.adapters.routers.users_crud import router as users_crud_router
+from app.adapters.routers.stats import router as stats_router
+from app.adapters.routers.well_known import router as well_known_router
+from app.dependencies.db import db
+from app.dependencies.keys import key_manager
+from app.dependencies.password_hasher import password_hasher
+from app.dependencies.principal_cache import principal_cache
+from app.dependencies.revocation import revocation_list
+from app.dependencies.roles import role_registry
+
+
+async def startup() -> None:
+    # Everything that reads files, environment or the database happens here rather than at import
+    setup_logger()
+    logger.info("Starting FastAPI app")
+    db.start()
+    key_manager.load()
+    async with db.session_factory() as session:
+        await role_registry.load(session=session)
+        await revocation_list.refresh(session=session)
+    revocation_list.start(session_factory=db.session_factory)
+    principal_cache.start(url=settings.get_db_url())
+
+
+async def shutdown() -> None:
+    logger.info("Shutting down FastAPI app")
+    await revocation_list.stop()
+    await principal_cache.stop()
+    password_hasher.shutdown()
+    await db.dispose()
+    shutdown_logger()
 
 
 @asynccontextmanager
 async def lifespan(app_: FastAPI):
-    logger.info("Starting FastAPI app")
+    await startup()
     yield
-    logger.info("Shutting down FastAPI app")
+    await shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(users_crud_router)
+app.include_router(stats_router)
+app.include_router(well_known_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
+    app.add_middleware(MetricsMiddleware)
+if settings.QUERY_RECORDER_ENABLED:
+    app.add_middleware(QueryRecorderMiddleware, repeat_threshold=settings.QUERY_RECORDER_REPEAT_THRESHOLD)
+# Added last so it is the outermost middleware and every log line of the request carries the id
+app.add_middleware(RequestIdMiddleware)
 
 
 @app.get("/")
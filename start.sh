@@ -1,10 +1,7 @@
 #!/bin/bash
 set -e
 
-echo "Running database migrations..."
-
-poetry run alembic upgrade head
-
 echo "Starting FastAPI application..."
 
-exec poetry run uvicorn main:app --host 0.0.0.0 --port 8000
+# Runs the migrations once, under an advisory lock, then starts the workers
+exec poetry run python -m app.server
@@ -0,0 +1,61 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+from sqlalchemy import exc
+
+from benchmarks.utils import SEED_PASSWORD, SeededUsers, remove_seeded_users, seed_users
+
+# Every test logs in from the same client address
+os.environ.setdefault("AUTH_RATE_LIMIT_IP_BURST", "1000000")
+os.environ.setdefault("AUTH_RATE_LIMIT_IP_PER_SECOND", "1000000")
+os.environ.setdefault("AUTH_RATE_LIMIT_USERNAME_BURST", "1000000")
+os.environ.setdefault("AUTH_RATE_LIMIT_USERNAME_PER_SECOND", "1000000")
+
+DATASET_SIZE = 1000
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def app():
+    """main:app after its startup; the tests that need it are skipped when no database is reachable."""
+    from app.config.config import MissingSettingsError
+    from main import app as app_, startup, shutdown
+
+    try:
+        await startup()
+    except (MissingSettingsError, OSError, exc.DBAPIError, asyncio.TimeoutError) as error:
+        await shutdown()
+        pytest.skip(f"No database for the tests: {error}")
+    try:
+        yield app_
+    finally:
+        await shutdown()
+
+
+@pytest.fixture(scope="session")
+async def client(app) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://tests") as client_:
+        yield client_
+
+
+@pytest.fixture(scope="session")
+async def seeded(app) -> SeededUsers:
+    seeded_ = await seed_users(DATASET_SIZE)
+    try:
+        yield seeded_
+    finally:
+        await remove_seeded_users(seeded_)
+
+
+@pytest.fixture(scope="session")
+async def admin_headers(client, seeded) -> dict[str, str]:
+    response = await client.post("/auth/login/", data={"username": seeded.admin_username, "password": SEED_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,56 @@
+import itertools
+import json
+
+import pytest
+
+from app.dependencies.counts import Explain
+from app.dependencies.db import db
+from app.dependencies.utils import make_statement, encode_cursor
+from app.domain.models import User
+from app.domain.schemas.pagination_info import PaginationInfo, SortField, Order, PaginationMode
+
+pytestmark = pytest.mark.anyio
+
+# With sequential scans and explicit sorts disabled the planner only uses them when no index can serve the query
+DISALLOWED_NODES = {"Seq Scan", "Sort", "Incremental Sort"}
+FILTERS = ({}, {"role_id": 1}, {"is_blocked": False}, {"is_active": True})
+COMBINATIONS = list(itertools.product(SortField, Order, FILTERS, PaginationMode))
+
+
+def plan_nodes(plan: dict, nodes: list[str]) -> list[str]:
+    nodes.append(plan["Node Type"])
+    for child in plan.get("Plans", []):
+        plan_nodes(child, nodes)
+    return nodes
+
+
+@pytest.fixture(scope="module")
+async def analyzed(seeded):
+    async with db.session_factory() as session:
+        await (await session.connection()).exec_driver_sql("ANALYZE users")
+        await session.commit()
+
+
+@pytest.mark.parametrize(
+    "sort_by, order_by, filters, mode", COMBINATIONS,
+    ids=[f"{sort.value}-{order.value}-{'-'.join(filters) or 'all'}-{mode.value}"
+         for sort, order, filters, mode in COMBINATIONS],
+)
+async def test_listing_is_served_by_an_index(analyzed, sort_by, order_by, filters, mode):
+    pagination = PaginationInfo(sort_by=sort_by, order_by=order_by, mode=mode, **filters)
+    async with db.session_factory() as session:
+        connection = await session.connection()
+        await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        await connection.exec_driver_sql("SET LOCAL enable_sort = off")
+        if mode is PaginationMode.CURSOR:
+            # A cursor from a real row, so the keyset condition is part of the plan too
+            first = (await session.execute(make_statement(pagination=pagination, model=User))).scalars().first()
+            assert first is not None
+            cursor = encode_cursor(pagination=pagination, model=User, row=first)
+            pagination = pagination.model_copy(update={"cursor": cursor})
+        plan = (await connection.execute(Explain(make_statement(pagination=pagination, model=User)))).scalar_one()
+        await session.rollback()
+
+    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+    nodes = plan_nodes(plan, [])
+    assert DISALLOWED_NODES.isdisjoint(nodes), f"no index serves this listing, plan nodes: {nodes}"
@@ -0,0 +1,33 @@
+import pytest
+
+from app.dependencies.query_recorder import query_budget
+
+pytestmark = pytest.mark.anyio
+
+# Statements per request once the principal and role caches are warm: the page (roles are not loaded) and its total
+LISTING_BUDGETS = [
+    ({}, 2),
+    ({"mode": "CURSOR", "sort_by": "created_at"}, 2),
+    ({"is_blocked": False, "is_active": True}, 2),
+    ({"search": "bench", "count": "EXACT"}, 2),
+]
+
+
+async def test_get_user_query_budget(client, admin_headers, seeded):
+    # Only the user itself, without the roles selectin query
+    params = {"user_id": str(seeded.user_ids[0])}
+    (await client.get("/users/user/", params=params, headers=admin_headers)).raise_for_status()
+
+    with query_budget(max_statements=1, max_repeats=1):
+        response = await client.get("/users/user/", params=params, headers=admin_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("params, max_statements", LISTING_BUDGETS)
+async def test_get_users_query_budget(client, admin_headers, seeded, params, max_statements):
+    (await client.get("/users/all/", params=params, headers=admin_headers)).raise_for_status()
+
+    with query_budget(max_statements=max_statements, max_repeats=1):
+        response = await client.get("/users/all/", params=params, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["items"]